@@ -1,25 +1,338 @@
+import mmap as mapeamento
+import multiprocessing
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def sais(texto : list[int], maior : int) -> list[int]:
+    """
+    Descrição: Constrói o suffix array de um texto codificado em inteiros com o algoritmo SA-IS
+    (Nong, Zhang & Chan, 2009), em tempo e memória O(n)
+    Parâmetros:
+        texto (list[int]): Texto codificado, com símbolos entre 0 e maior
+        maior (int): Maior símbolo presente no texto
+    Retorna:
+        list[int]: O suffix array do texto
+    """
+    n = len(texto)
+    if n == 0:
+        return []
+    if n == 1:
+        return [0]
+    if n == 2:
+        return [0, 1] if texto[0] < texto[1] else [1, 0]
+
+    # classificar cada posição como tipo S (True) ou tipo L (False)
+    tipo_s = [False] * n
+    for i in range(n - 2, -1, -1):
+        tipo_s[i] = tipo_s[i + 1] if texto[i] == texto[i + 1] else texto[i] < texto[i + 1]
+
+    # início dos baldes L e S de cada símbolo
+    inicio_l = [0] * (maior + 1)
+    inicio_s = [0] * (maior + 1)
+    for i in range(n):
+        if not tipo_s[i]:
+            inicio_s[texto[i]] += 1
+        else:
+            inicio_l[texto[i] + 1] += 1
+    for i in range(maior + 1):
+        inicio_s[i] += inicio_l[i]
+        if i < maior:
+            inicio_l[i + 1] += inicio_s[i]
+
+    sa = [-1] * n
+
+    def induzir(lms : list[int]):
+        # colocar as posições LMS nos baldes e induzir as posições L e S a partir delas
+        for i in range(n):
+            sa[i] = -1
+        balde = inicio_s[:]
+        for d in lms:
+            if d == n:
+                continue
+            sa[balde[texto[d]]] = d
+            balde[texto[d]] += 1
+        balde = inicio_l[:]
+        sa[balde[texto[n - 1]]] = n - 1
+        balde[texto[n - 1]] += 1
+        for i in range(n):
+            v = sa[i]
+            if v >= 1 and not tipo_s[v - 1]:
+                sa[balde[texto[v - 1]]] = v - 1
+                balde[texto[v - 1]] += 1
+        balde = inicio_l[:]
+        for i in range(n - 1, -1, -1):
+            v = sa[i]
+            if v >= 1 and tipo_s[v - 1]:
+                balde[texto[v - 1] + 1] -= 1
+                sa[balde[texto[v - 1] + 1]] = v - 1
+
+    # posições LMS (S precedido de L) e o seu índice por ordem no texto
+    indice_lms = [-1] * (n + 1)
+    lms = []
+    for i in range(1, n):
+        if not tipo_s[i - 1] and tipo_s[i]:
+            indice_lms[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+    induzir(lms)
+
+    if m:
+        # nomear as substrings LMS pela ordem induzida e resolver o problema reduzido recursivamente
+        lms_ord = [v for v in sa if indice_lms[v] != -1]
+        reduzido = [0] * m
+        nome = 0
+        reduzido[indice_lms[lms_ord[0]]] = 0
+        for i in range(1, m):
+            esq, dir = lms_ord[i - 1], lms_ord[i]
+            fim_esq = lms[indice_lms[esq] + 1] if indice_lms[esq] + 1 < m else n
+            fim_dir = lms[indice_lms[dir] + 1] if indice_lms[dir] + 1 < m else n
+            igual = True
+            if fim_esq - esq != fim_dir - dir:
+                igual = False
+            else:
+                while esq < fim_esq:
+                    if texto[esq] != texto[dir]:
+                        break
+                    esq += 1
+                    dir += 1
+                if esq == n or texto[esq] != texto[dir]:
+                    igual = False
+            if not igual:
+                nome += 1
+            reduzido[indice_lms[lms_ord[i]]] = nome
+        sa_reduzido = sais(reduzido, nome)
+        induzir([lms[i] for i in sa_reduzido])
+    return sa
+
+
+class TextoMapeado:
+    """
+    Classe que representa um texto latin-1 guardado num ficheiro mapeado em memória, com as operações de str 
+    usadas pela classe BWT (indexação, count, find e iteração), sem copiar o texto para a memória do processo
+    """
+    def __init__(self, mapa : mapeamento.mmap, inicio : int, tamanho : int):
+        """
+        Descrição: Construtor da classe TextoMapeado
+        Parâmetros:
+            mapa (mmap): Ficheiro mapeado em memória
+            inicio (int): Posição do primeiro carácter do texto no ficheiro
+            tamanho (int): Número de caracteres do texto
+        """
+        self.mapa = mapa
+        self.inicio = inicio
+        self.tamanho = tamanho
+
+    def __len__(self) -> int:
+        return self.tamanho
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            inicio, fim, passo = i.indices(self.tamanho)
+            return self.mapa[self.inicio + inicio:self.inicio + fim:passo].decode('latin-1') if fim > inicio else ''
+        if i < 0:
+            i += self.tamanho
+        if not 0 <= i < self.tamanho:
+            raise IndexError('Índice fora do texto')
+        return chr(self.mapa[self.inicio + i])
+
+    def __iter__(self):
+        for bloco in range(0, self.tamanho, 1 << 16):
+            yield from self[bloco:bloco + (1 << 16)]
+
+    def __str__(self) -> str:
+        return self[:]
+
+    def __eq__(self, outro) -> bool:
+        return str(self) == str(outro)
+
+    def count(self, sub : str, inicio : int = 0, fim : int = None) -> int:
+        inicio, fim, _ = slice(inicio, fim).indices(self.tamanho)
+        return self.mapa[self.inicio + inicio:self.inicio + fim].count(sub.encode('latin-1')) if fim > inicio else 0
+
+    def find(self, sub : str, inicio : int = 0, fim : int = None) -> int:
+        inicio, fim, _ = slice(inicio, fim).indices(self.tamanho)
+        pos = self.mapa.find(sub.encode('latin-1'), self.inicio + inicio, self.inicio + fim)
+        return pos - self.inicio if pos != -1 else -1
+
+
+class TextoRuns:
+    """
+    Classe que representa uma BWT codificada por runs (run-length encoding): guarda apenas o símbolo e o início 
+    de cada run e, para cada símbolo, os seus runs e o número acumulado de ocorrências antes de cada um
+    Disponibiliza as operações de str usadas pela classe BWT em memória proporcional ao número de runs
+    """
+    def __init__(self, bwt : str = ''):
+        """
+        Descrição: Construtor da classe TextoRuns
+        Parâmetros:
+            bwt (str): BWT a codificar
+        """
+        self.tamanho = len(bwt)
+        cabecas = []
+        self.inicios = array('I')
+        self.runs = {}
+        self.acumulado = {}
+        for run in re.finditer(r'(.)\1*', bwt, re.DOTALL):
+            car = run.group(1)
+            if car not in self.runs:
+                self.runs[car] = array('I')
+                self.acumulado[car] = array('I', [0])
+            self.runs[car].append(len(cabecas))
+            self.acumulado[car].append(self.acumulado[car][-1] + run.end() - run.start())
+            cabecas.append(car)
+            self.inicios.append(run.start())
+        self.cabecas = ''.join(cabecas)
+
+    def __len__(self) -> int:
+        return self.tamanho
+
+    def run(self, i : int) -> int:
+        """
+        Descrição: Índice do run que contém a posição i
+        """
+        return bisect_right(self.inicios, i) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ''.join(self[j] for j in range(*i.indices(self.tamanho)))
+        if i < 0:
+            i += self.tamanho
+        if not 0 <= i < self.tamanho:
+            raise IndexError('Índice fora da BWT')
+        return self.cabecas[self.run(i)]
+
+    def __iter__(self):
+        for j, car in enumerate(self.cabecas):
+            fim = self.inicios[j + 1] if j + 1 < len(self.inicios) else self.tamanho
+            yield from car * (fim - self.inicios[j])
+
+    def __str__(self) -> str:
+        return ''.join(self)
+
+    def __eq__(self, outro) -> bool:
+        return str(self) == str(outro)
+
+    def ocorrencias(self, simbolo : str, i : int) -> int:
+        """
+        Descrição: Conta as ocorrências de um símbolo antes da posição i (rank) com duas pesquisas binárias: 
+        o run que contém a posição e o número de runs do símbolo que o antecedem
+        Parâmetros:
+            simbolo (str): Símbolo a contar
+            i (int): Posição da BWT (exclusiva)
+        Retorna:
+            int: Número de ocorrências do símbolo em bwt[:i]
+        """
+        if simbolo not in self.runs or i <= 0:
+            return 0
+        j = self.run(min(i, self.tamanho) - 1)
+        runs = self.runs[simbolo]
+        k = bisect_left(runs, j)
+        if k < len(runs) and runs[k] == j:
+            return self.acumulado[simbolo][k] + min(i, self.tamanho) - self.inicios[j]
+        return self.acumulado[simbolo][k]
+
+    def count(self, sub : str, inicio : int = 0, fim : int = None) -> int:
+        inicio, fim, _ = slice(inicio, fim).indices(self.tamanho)
+        return max(0, self.ocorrencias(sub, fim) - self.ocorrencias(sub, inicio))
+
+    def find(self, sub : str, inicio : int = 0, fim : int = None) -> int:
+        inicio, fim, _ = slice(inicio, fim).indices(self.tamanho)
+        if inicio >= fim:
+            return -1
+        j = self.cabecas.find(sub, self.run(inicio))
+        if j == -1:
+            return -1
+        pos = max(self.inicios[j], inicio)
+        return pos if pos < fim else -1
+
+
+# índice partilhado pelos processos de proc_padroes_batch, definido uma vez por processo
+_indice_partilhado = None
+
+def _iniciar_processo(indice : 'BWT'):
+    """
+    Descrição: Inicializa um processo do pool guardando o índice partilhado
+    (herdado por fork sem ser serializado, ou serializado uma única vez por processo)
+    """
+    global _indice_partilhado
+    _indice_partilhado = indice
+
+def _proc_padrao_processo(argumentos : tuple[str, bool]) -> list[int]:
+    """
+    Descrição: Procura um padrão no índice partilhado do processo
+    """
+    padrao, localizar = argumentos
+    return _indice_partilhado.locate(padrao) if localizar else _indice_partilhado.proc_padroes(padrao)
+
+
 class BWT:
     """
     Classe que implementa a Transformada de Burrows-Wheeler (BWT), a recuperação da sequência da BWT 
     e a procura de padrões com a BWT (sem e com suffix array)
     ...
     """
-    def __init__(self, seq : str = ''):
+    ASSINATURA = b'BWTIDX01'        # cabeçalho dos ficheiros criados por save()
+
+    def __init__(self, seq : str = '', usar_matriz : bool = False, taxa_occ : int = 32, taxa_sa : int = 32, 
+                 usar_numpy : bool = True, guardar_sa : bool = True):
         """
         Descrição: Construtor da classe BWT
         Parâmetros:
             seq (str): Sequência a inserir com ou sem marcador ('$') no final 
                        Caso a sequência seja inserida sem marcador no final será automaticamente adicionado o marcador ('$') no final da sequência
                        Caso não seja inserida nenhuma sequência este parâmetro assume uma string vazia ('')
+            usar_matriz (bool): Se True, a BWT é construída a partir da matriz de Burrows-Wheeler (implementação de referência, O(n²) em memória)
+                                Por omissão a BWT é derivada do suffix array em memória O(n)
+            taxa_occ (int): Intervalo entre as contagens guardadas na tabela de ocorrências (occ)
+                            Valores maiores reduzem a memória da tabela à custa de consultas mais lentas
+            taxa_sa (int): Guarda-se a entrada do suffix array das linhas cuja posição no texto é múltipla de taxa_sa
+                           Valores maiores reduzem a memória do suffix array amostrado à custa de localizações mais lentas
+            usar_numpy (bool): Se True e o NumPy estiver instalado, o array c e a tabela occ são construídos de forma vetorizada
+            guardar_sa (bool): Se True guarda a sequência e o suffix array completo (array('I')), usados por proc_padroes_sa 
+                               e pelas repetições; se False descarta-os após a amostragem e a memória do índice passa a 
+                               depender apenas da BWT, da tabela occ e do suffix array amostrado (taxa_sa)
         """
+        if taxa_occ < 1:
+            raise ValueError('A taxa de amostragem da tabela occ deve ser positiva')
+        if taxa_sa < 1:
+            raise ValueError('A taxa de amostragem do suffix array deve ser positiva')
+        self.taxa_occ = taxa_occ
+        self.taxa_sa = taxa_sa
+        self.usar_numpy = usar_numpy and np is not None
         self.seq = seq
-        if seq.endswith('$'):
-            self.bwt = self.constr_bwt(seq)
-        else: self.bwt = self.constr_bwt(seq + '$') if seq else ''
         self.suffix_array = self.constr_suffix_array(seq)
-        self.primeira_col = sorted(self.bwt)
+        texto = seq if seq.endswith('$') or not seq else seq + '$'
+        linhas = None
+        if usar_matriz:
+            self.bwt = self.constr_bwt(texto)
+        else:
+            # reaproveitar o suffix array da sequência: o sufixo '$' acrescentado é sempre o primeiro
+            if texto is seq:
+                sa_texto = self.suffix_array
+            elif min(seq) > '$':
+                sa_texto = [len(seq)] + self.suffix_array
+            else:
+                sa_texto = None
+            linhas = self.ordenar_rotacoes(texto, sa_texto)
+            self.bwt = self.constr_bwt_sa(texto, linhas)
         self.c = self.constr_array_c()
         self.occ = self.constr_tabela_occ()
+        self.sa_marcas, self.sa_blocos, self.sa_amostras = self.constr_sa_amostrado(linhas if linhas is not None else self.linhas_lf())
+        if guardar_sa:
+            self.suffix_array = array('I', self.suffix_array)
+        else:
+            self.seq = self.suffix_array = None
+        self.reverso = None
+        self.lcp = None
 
     def definir_bwt(self, bwt : str):
         """
@@ -28,13 +341,15 @@ class BWT:
             bwt (str): BWT a ser definida
         """
         self.bwt = bwt
-        self.primeira_col = sorted(self.bwt)
         self.c = self.constr_array_c()
         self.occ = self.constr_tabela_occ()
+        self.sa_marcas, self.sa_blocos, self.sa_amostras = self.constr_sa_amostrado(self.linhas_lf())
+        self.reverso = None
 
     def constr_bwt(self, seq : str) -> str:
         """
-        Descrição: Constrói a Transformada de Burrows-Wheeler (BWT)
+        Descrição: Constrói a Transformada de Burrows-Wheeler (BWT) a partir da matriz de Burrows-Wheeler completa
+        (implementação de referência, O(n²) em memória)
         Parâmetros: 
             seq (str): Sequência fornecida para a contrução da BWT
         Retorna:
@@ -45,49 +360,275 @@ class BWT:
         ultima_col = [linha[-1:] for linha in matriz_ord] # obter a última coluna da matriz de Burrows-Wheeler
         return ''.join(ultima_col) # retornar uma string com a BWT
     
-    def inverso_bwt(self) -> str:
+    def ordenar_rotacoes(self, texto : str, sa : list[int] = None) -> list[int]:
         """
-        Descrição: Recupera a sequência original
+        Descrição: Obtém as posições de início das rotações do texto pela ordem das linhas da matriz 
+        de Burrows-Wheeler, sem construir a matriz
+        Quando o último símbolo do texto é único e menor que todos os outros, a ordem das rotações coincide 
+        com a do suffix array; caso contrário ordenam-se os sufixos do texto duplicado
         Parâmetros:
-            seq (str): Sequência da BWT
+            texto (str): Texto terminado pelo marcador
+            sa (list[int]): Suffix array do texto, caso já tenha sido calculado
+        Retorna:
+            list[int]: Posição de início da rotação de cada linha da matriz
+        """
+        if not texto:
+            return []
+        if texto.count(texto[-1]) == 1 and min(texto) == texto[-1]:
+            return sa if sa is not None else self.constr_suffix_array(texto)
+        n = len(texto)
+        return [i for i in self.constr_suffix_array(texto + texto) if i < n]
+
+    def constr_bwt_sa(self, texto : str, linhas : list[int]) -> str:
+        """
+        Descrição: Constrói a BWT a partir da ordem das rotações (suffix array), em memória O(n): 
+        cada linha da matriz termina no símbolo que antecede o início da sua rotação
+        Parâmetros:
+            texto (str): Texto terminado pelo marcador
+            linhas (list[int]): Posição de início da rotação de cada linha da matriz
+        Retorna:
+            str: Sequência da BWT
+        """
+        return ''.join([texto[i - 1] for i in linhas])
+
+    def inverso_bwt(self) -> str:
+        """
+        Descrição: Recupera a sequência original em tempo linear, percorrendo o Last-First (LF) mapping 
+        a partir da linha cuja rotação termina no marcador ('$') e preenchendo a sequência do fim para o início
         Retorna:
             str: Sequência original
         """
-        # iniciar uma tabela vazia com número de strings vazias igual ao tamanho da seq
-        tabela = [''] * len(self.bwt)
-        for _ in range(len(self.bwt)):
-            # Adicionar a sequência BWT como uma nova coluna em frente a cada string na tabela
-            tabela = sorted([self.bwt[i] + tabela[i] for i in range(len(self.bwt))])
-        # A linha correta termina com o marcador ('$')
-        for linha in tabela:
-            if linha.endswith('$'):
-                return linha
-        return ''
+        linha = self.bwt.find('$')
+        if linha == -1:
+            return ''
+        lf = self.constr_lf()
+        seq = [''] * len(self.bwt)
+        for i in range(len(self.bwt) - 1, -1, -1):
+            seq[i] = self.bwt[linha]
+            linha = lf[linha]
+        return ''.join(seq)
+
+    def constr_lf(self) -> array:
+        """
+        Descrição: Constrói o Last-First (LF) mapping de todas as linhas numa única passagem pela BWT, 
+        a partir do array c e das contagens acumuladas de cada símbolo
+        Retorna:
+            array: Linha da primeira coluna correspondente a cada linha da última coluna
+        """
+        contagens = dict.fromkeys(self.c, 0)
+        lf = array('I', [0]) * len(self.bwt)
+        for i, car in enumerate(self.bwt):
+            lf[i] = self.c[car] + contagens[car]
+            contagens[car] += 1
+        return lf
+
+    def codificar_bwt(self):
+        """
+        Descrição: Codifica a BWT como um array NumPy uint8 (um byte latin-1 por símbolo) para as construções vetorizadas
+        Retorna:
+            numpy.ndarray: BWT codificada, ou None se o NumPy não estiver disponível ou a BWT tiver símbolos fora do latin-1
+        """
+        if not self.usar_numpy or not isinstance(self.bwt, str):
+            return None
+        try:
+            return np.frombuffer(self.bwt.encode('latin-1'), dtype = np.uint8)
+        except UnicodeEncodeError:
+            return None
 
     def constr_array_c(self):
         """
         Descrição: Constrói o array de contagens (c) necessário para o Last-First (LF) mapping
+        Com NumPy as contagens obtêm-se com bincount e a soma acumulada; caso contrário contando cada símbolo na BWT
         """
+        codigos = self.codificar_bwt()
+        if codigos is not None:
+            contagens = np.bincount(codigos, minlength = 256)
+            inicios = np.cumsum(contagens) - contagens
+            return {chr(car): int(inicios[car]) for car in np.flatnonzero(contagens)}
         c = {}
-        sorted_bwt = sorted(self.bwt)
-        for car in set(self.bwt):
-            c[car] = sorted_bwt.index(car)
+        total = 0
+        for car in sorted(set(self.bwt)):
+            c[car] = total
+            total += self.bwt.count(car)
         return c
 
     def constr_tabela_occ(self):
         """
-        Descrição: Constrói a tabela de ocurrências (occ) necessária para o Last-First (LF) mapping
+        Descrição: Constrói a tabela de ocurrências (occ) amostrada necessária para o Last-First (LF) mapping
+        Para cada símbolo guarda, num array('I'), o número de ocorrências na BWT antes de cada 
+        múltiplo de taxa_occ; as restantes posições são obtidas em ocorrencias()
+        Com NumPy as contagens de cada bloco obtêm-se com uma soma vetorizada por símbolo
         """
+        codigos = self.codificar_bwt()
+        if codigos is not None:
+            return self.constr_tabela_occ_numpy(codigos)
         occ = {}
+        n = len(self.bwt)
         for car in set(self.bwt):
-            occ[car] = [0] * (len(self.bwt) + 1)
-        for i in range(1, len(self.bwt) + 1):
-            car = self.bwt[i - 1]
-            for key in occ:
-                occ[key][i] = occ[key][i - 1]
-            occ[car][i] += 1
+            contagens = array('I', [0])
+            total = 0
+            for fim in range(self.taxa_occ, n + 1, self.taxa_occ):
+                total += self.bwt.count(car, fim - self.taxa_occ, fim)
+                contagens.append(total)
+            occ[car] = contagens
         return occ
 
+    def constr_tabela_occ_numpy(self, codigos) -> dict:
+        """
+        Descrição: Constrói a tabela occ amostrada a partir da BWT codificada: os blocos completos de taxa_occ 
+        posições formam uma matriz e a soma acumulada das ocorrências de cada símbolo por bloco dá as contagens guardadas
+        Parâmetros:
+            codigos (numpy.ndarray): BWT codificada em uint8
+        Retorna:
+            dict: Array('I') de contagens por símbolo
+        """
+        n_blocos = len(codigos) // self.taxa_occ
+        blocos = codigos[:n_blocos * self.taxa_occ].reshape(n_blocos, self.taxa_occ)
+        occ = {}
+        for car in np.flatnonzero(np.bincount(codigos, minlength = 256)):
+            contagens = np.zeros(n_blocos + 1, dtype = np.uint32)
+            np.cumsum(np.count_nonzero(blocos == car, axis = 1), out = contagens[1:])
+            occ[chr(car)] = array('I', contagens.tobytes())
+        return occ
+
+    def ocorrencias(self, simbolo : str, i : int) -> int:
+        """
+        Descrição: Conta as ocorrências de um símbolo na BWT antes da posição i (rank), partindo 
+        da contagem guardada mais próxima e percorrendo no máximo taxa_occ - 1 posições
+        Parâmetros:
+            simbolo (str): Símbolo a contar
+            i (int): Posição da BWT (exclusiva)
+        Retorna:
+            int: Número de ocorrências do símbolo em bwt[:i]
+        """
+        if simbolo not in self.occ:
+            return 0
+        bloco = i // self.taxa_occ
+        inicio = bloco * self.taxa_occ
+        return self.occ[simbolo][bloco] + (self.bwt.count(simbolo, inicio, i) if i > inicio else 0)
+
+    def lf(self, linha : int) -> int:
+        """
+        Descrição: Last-First (LF) mapping: linha da matriz cuja rotação começa uma posição antes da rotação da linha dada
+        Parâmetros:
+            linha (int): Linha da matriz
+        Retorna:
+            int: Linha correspondente na primeira coluna
+        """
+        simbolo = self.bwt[linha]
+        return self.c[simbolo] + self.ocorrencias(simbolo, linha)
+
+    def linhas_lf(self) -> list[int]:
+        """
+        Descrição: Recupera a posição de início da rotação de cada linha da matriz percorrendo o LF mapping, 
+        tomando como posição 0 a linha cuja rotação termina no marcador ('$'), i.e., a sequência devolvida por inverso_bwt
+        Retorna:
+            list[int]: Posição de início da rotação de cada linha da matriz
+        """
+        n = len(self.bwt)
+        lf = self.constr_lf()
+        linhas = array('I', [0]) * n
+        linha = max(self.bwt.find('$'), 0)
+        for pos in range(n, 0, -1):
+            linhas[linha] = pos % n
+            linha = lf[linha]
+        return linhas
+
+    def constr_sa_amostrado(self, linhas : list[int]) -> tuple[bytearray, array, array]:
+        """
+        Descrição: Constrói o suffix array amostrado: guarda apenas as entradas cuja posição no texto é múltipla 
+        de taxa_sa e marca as respetivas linhas num vetor de bits com contagens acumuladas a cada 512 linhas
+        Parâmetros:
+            linhas (list[int]): Posição de início da rotação de cada linha da matriz (suffix array completo)
+        Retorna:
+            tuple[bytearray, array, array]: Vetor de bits das linhas amostradas, contagens acumuladas por bloco 
+                                            e posições amostradas por ordem de linha
+        """
+        n = len(linhas)
+        marcas = bytearray((n + 7) // 8)
+        blocos = array('I')
+        amostras = array('I')
+        for linha, pos in enumerate(linhas):
+            if linha % 512 == 0:
+                blocos.append(len(amostras))
+            if pos % self.taxa_sa == 0:
+                marcas[linha >> 3] |= 1 << (linha & 7)
+                amostras.append(pos)
+        return marcas, blocos, amostras
+
+    def amostrada(self, linha : int) -> bool:
+        """
+        Descrição: Indica se a entrada do suffix array de uma linha está guardada no suffix array amostrado
+        """
+        return bool(self.sa_marcas[linha >> 3] >> (linha & 7) & 1)
+
+    def amostras_antes(self, linha : int) -> int:
+        """
+        Descrição: Conta as linhas amostradas antes de uma linha: contagem do bloco de 512 linhas + bits a 1 até à linha
+        Parâmetros:
+            linha (int): Linha da matriz (exclusiva)
+        Retorna:
+            int: Índice em sa_amostras da primeira amostra a partir da linha
+        """
+        if linha >= len(self.bwt):
+            return len(self.sa_amostras)
+        indice = self.sa_blocos[linha >> 9]
+        inicio, fim = (linha >> 9) << 6, linha >> 3
+        if fim > inicio:
+            indice += int.from_bytes(self.sa_marcas[inicio:fim], 'little').bit_count()
+        if linha & 7:
+            indice += (self.sa_marcas[fim] & ((1 << (linha & 7)) - 1)).bit_count()
+        return indice
+
+    def posicao(self, linha : int) -> int:
+        """
+        Descrição: Obtém a posição no texto da rotação de uma linha, seguindo o LF mapping até uma linha 
+        amostrada (no máximo taxa_sa - 1 passos)
+        Parâmetros:
+            linha (int): Linha da matriz
+        Retorna:
+            int: Posição no texto
+        """
+        passos = 0
+        while not self.amostrada(linha):
+            linha = self.lf(linha)
+            passos += 1
+        return self.sa_amostras[self.amostras_antes(linha)] + passos
+
+    def locate(self, padrao : str) -> list[int]:
+        """
+        Descrição: Procura o padrão com a BWT e converte as linhas encontradas em posições na sequência 
+        original através do suffix array amostrado
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            list[int]: Lista ordenada das posições da sequência onde o padrão ocorre
+        """
+        topo, fundo = self.intervalo_padrao(padrao)
+        return sorted(self.posicao(linha) for linha in range(topo, fundo + 1))
+
+    def intervalo_padrao(self, padrao : str) -> tuple[int, int]:
+        """
+        Descrição: Procura recuada (backward search) do padrão usando apenas as consultas ao array c 
+        e à tabela occ, sem percorrer nem copiar a BWT ou o padrão
+        Parâmetros:
+            padrao (str): O padrão a procurar na BWT
+        Retorna:
+            tuple[int, int]: Primeira e última linhas (inclusivas) da matriz que começam pelo padrão
+                             Se o padrão não ocorrer a última linha é menor que a primeira
+        """
+        topo = 0
+        fundo = len(self.bwt) - 1
+        for i in range(len(padrao) - 1, -1, -1):
+            if topo > fundo:
+                break
+            simbolo = padrao[i]
+            if simbolo not in self.c:
+                return 0, -1
+            topo = self.c[simbolo] + self.ocorrencias(simbolo, topo)
+            fundo = self.c[simbolo] + self.ocorrencias(simbolo, fundo + 1) - 1
+        return topo, fundo
+
     def proc_padroes(self, padrao : str) -> list[int]:
         """
         Descrição: Procura o padrão usando o Last-First (LF) mapping, restringindo o intervalo 
@@ -97,53 +638,913 @@ class BWT:
         Returna:
             list[int]: Lista de índices das linhas que contêm o padrão a procurar
         """
-        topo = 0
-        fundo = len(self.bwt) - 1
-        while topo <= fundo and padrao:
-            simbolo = padrao[-1]
-            padrao = padrao[:-1]
-            if simbolo in self.bwt[topo:fundo + 1]:
-                topo = self.c[simbolo] + self.occ[simbolo][topo]
-                fundo = self.c[simbolo] + self.occ[simbolo][fundo + 1] - 1
-            else:
-                return []
+        topo, fundo = self.intervalo_padrao(padrao)
         return list(range(topo, fundo + 1))
+
+    def count(self, padrao : str) -> int:
+        """
+        Descrição: Conta as ocorrências do padrão a partir do tamanho do intervalo de linhas 
+        obtido pela procura recuada, sem construir a lista de índices
+        Parâmetros:
+            padrao (str): O padrão a procurar na BWT
+        Retorna:
+            int: Número de ocorrências do padrão
+        """
+        topo, fundo = self.intervalo_padrao(padrao)
+        return max(0, fundo - topo + 1)
     
+    def indice_reverso(self) -> 'BWT':
+        """
+        Descrição: Obtém (construindo na primeira utilização) o índice da sequência invertida, usado para 
+        testar se um segmento do padrão ocorre na sequência ao estendê-lo para a direita
+        Retorna:
+            BWT: Índice da sequência invertida (sem suffix array amostrado)
+        """
+        if self.reverso is None:
+            seq = self.inverso_bwt()
+            seq = seq[:-1] if seq.endswith('$') else seq
+            self.reverso = BWT(seq[::-1], taxa_occ = self.taxa_occ, taxa_sa = len(seq) + 1, guardar_sa = False)
+        return self.reverso
+
+    def constr_array_d(self, padrao : str) -> list[int]:
+        """
+        Descrição: Constrói o array D (Li & Durbin, 2009): D[i] é um limite inferior do número de diferenças 
+        necessárias para alinhar padrao[:i + 1], obtido dividindo o prefixo em segmentos que não ocorrem na sequência
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            list[int]: Limite inferior de diferenças para cada prefixo do padrão
+        """
+        reverso = self.indice_reverso()
+        d = [0] * len(padrao)
+        erros = 0
+        topo, fundo = 0, len(reverso.bwt) - 1
+        for i, simbolo in enumerate(padrao):
+            if simbolo in reverso.c:
+                topo = reverso.c[simbolo] + reverso.ocorrencias(simbolo, topo)
+                fundo = reverso.c[simbolo] + reverso.ocorrencias(simbolo, fundo + 1) - 1
+            if simbolo not in reverso.c or topo > fundo:
+                topo, fundo = 0, len(reverso.bwt) - 1
+                erros += 1
+            d[i] = erros
+        return d
+
+    def simbolos_substituicao(self) -> list[str]:
+        """
+        Descrição: Símbolos que podem substituir um símbolo do padrão na procura aproximada (todos exceto o marcador)
+        """
+        return sorted(car for car in self.c if car != '$')
+
+    def proc_padroes_aprox(self, padrao : str, max_erros : int = 1) -> list[tuple[int, int]]:
+        """
+        Descrição: Procura recuada aproximada: encontra as ocorrências do padrão com no máximo max_erros 
+        substituições, explorando os símbolos alternativos em cada passo e abandonando os ramos em que os erros 
+        restantes são inferiores ao limite do array D
+        Parâmetros:
+            padrao (str): O padrão a procurar
+            max_erros (int): Número máximo de substituições
+        Retorna:
+            list[tuple[int, int]]: Lista ordenada de pares (posição na sequência, número de substituições)
+        """
+        if max_erros < 0:
+            raise ValueError('O número máximo de erros não pode ser negativo')
+        if not padrao:
+            return []
+        d = self.constr_array_d(padrao)
+        simbolos = self.simbolos_substituicao()
+        intervalos = []
+
+        # retrocesso com uma pilha explícita de ramos (i, erros restantes, topo, fundo), sem limite de recursão
+        pilha = [(len(padrao) - 1, max_erros, 0, len(self.bwt) - 1)]
+        while pilha:
+            i, erros, topo, fundo = pilha.pop()
+            if i < 0:
+                intervalos.append((topo, fundo, max_erros - erros))
+                continue
+            if erros < d[i]:
+                continue
+            for simbolo in simbolos:
+                if simbolo != padrao[i] and erros == 0:
+                    continue
+                novo_topo = self.c[simbolo] + self.ocorrencias(simbolo, topo)
+                novo_fundo = self.c[simbolo] + self.ocorrencias(simbolo, fundo + 1) - 1
+                if novo_topo <= novo_fundo:
+                    pilha.append((i - 1, erros - (simbolo != padrao[i]), novo_topo, novo_fundo))
+        return sorted((self.posicao(linha), n_erros) for topo, fundo, n_erros in intervalos for linha in range(topo, fundo + 1))
+
+    def estender_bidirecional(self, indice : 'BWT', intervalo : tuple[int, int, int], simbolo : str) -> tuple[int, int, int]:
+        """
+        Descrição: Procura recuada sobre um intervalo bidirecional (topo no índice, topo no outro índice, tamanho)
+        O novo topo no outro índice obtém-se somando ao topo atual as ocorrências, no intervalo, dos símbolos 
+        menores que o símbolo acrescentado, pela mesma ordem em que esses prolongamentos ficam no outro índice
+        Parâmetros:
+            indice (BWT): Índice em que se faz a procura recuada (o próprio ou o reverso)
+            intervalo (tuple[int, int, int]): Topo no índice, topo no outro índice e número de linhas
+            simbolo (str): Símbolo a acrescentar
+        Retorna:
+            tuple[int, int, int]: Intervalo bidirecional do padrão prolongado (tamanho 0 se não ocorrer)
+        """
+        topo, outro, tamanho = intervalo
+        for car in sorted(indice.c):
+            antes = indice.ocorrencias(car, topo)
+            ocorrencias = indice.ocorrencias(car, topo + tamanho) - antes
+            if car == simbolo:
+                return indice.c[car] + antes, outro, ocorrencias
+            if car > simbolo:
+                break
+            outro += ocorrencias
+        return 0, 0, 0
+
+    def proc_smems(self, read : str, tamanho_min : int = 1, max_ocorrencias : int = None) -> list[tuple[int, int, list[int]]]:
+        """
+        Descrição: Enumera os super-maximal exact matches (SMEMs) entre um read e a sequência, para usar como sementes de alinhamento
+        Usa a extensão bidirecional (Li, 2012) com o índice da sequência invertida: a partir de uma posição x do read 
+        estende-se o match para a direita, guardando os intervalos sempre que o número de ocorrências muda, e depois 
+        estendem-se todos esses intervalos em conjunto para a esquerda; os que deixam de poder ser estendidos sem 
+        que haja um mais longo ainda ativo são os SMEMs que contêm x. A procura recomeça no fim do maior match de x, 
+        pelo que cada símbolo do read é visitado poucas vezes em vez de uma procura recuada a partir de cada posição
+        Parâmetros:
+            read (str): Read a comparar com a sequência
+            tamanho_min (int): Tamanho mínimo dos SMEMs devolvidos
+            max_ocorrencias (int): Se definido, os SMEMs com mais ocorrências são devolvidos sem posições (lista vazia)
+        Retorna:
+            list[tuple[int, int, list[int]]]: SMEMs como (posição no read, tamanho, posições ordenadas na sequência), por posição no read
+        """
+        reverso = self.indice_reverso()
+        permitidos = set(self.simbolos_substituicao())      # sem o marcador nem símbolos proibidos pela subclasse
+        n = len(self.bwt)
+        smems = []
+        x = 0
+        while x < len(read):
+            if read[x] not in permitidos:
+                x += 1
+                continue
+            simbolo = read[x]
+            intervalo = (self.c[simbolo], reverso.c[simbolo], self.ocorrencias(simbolo, n))
+
+            # extensão para a direita: (intervalo, fim) de cada match read[x:fim] cujo intervalo muda a seguir
+            anteriores = []
+            fim = x + 1
+            while True:
+                if fim == len(read) or read[fim] not in permitidos:
+                    anteriores.append((intervalo, fim))
+                    break
+                topo, outro, tamanho = self.estender_bidirecional(reverso, (intervalo[1], intervalo[0], intervalo[2]), read[fim])
+                if tamanho != intervalo[2]:
+                    anteriores.append((intervalo, fim))
+                if tamanho == 0:
+                    break
+                intervalo = (outro, topo, tamanho)
+                fim += 1
+            anteriores.reverse()        # matches mais longos (intervalos menores) primeiro
+            seguinte = anteriores[0][1]
+
+            # extensão para a esquerda de todos os matches em simultâneo
+            encontrados = []
+            for i in range(x - 1, -2, -1):
+                simbolo = read[i] if i >= 0 and read[i] in permitidos else None
+                atuais = []
+                for intervalo, fim in anteriores:
+                    tamanho = 0
+                    if simbolo is not None:
+                        estendido = self.estender_bidirecional(self, intervalo, simbolo)
+                        tamanho = estendido[2]
+                    if tamanho == 0:
+                        # só é SMEM se nenhum match mais longo continuar ativo nem já tiver sido encontrado
+                        if not atuais and (not encontrados or i + 1 < encontrados[-1][0]):
+                            encontrados.append((i + 1, fim, intervalo))
+                    elif not atuais or tamanho != atuais[-1][0][2]:
+                        atuais.append((estendido, fim))
+                if not atuais:
+                    break
+                anteriores = atuais
+
+            for inicio, fim, (topo, _, tamanho) in reversed(encontrados):
+                if fim - inicio < max(tamanho_min, 1):
+                    continue
+                if max_ocorrencias is not None and tamanho > max_ocorrencias:
+                    posicoes = []
+                else:
+                    posicoes = sorted(self.posicao(linha) for linha in range(topo, topo + tamanho))
+                smems.append((inicio, fim - inicio, posicoes))
+            x = seguinte
+        return sorted(smems)
+
+    def proc_padroes_batch(self, padroes : list[str], workers : int = 1, localizar : bool = False) -> list[list[int]]:
+        """
+        Descrição: Procura um conjunto de padrões (e.g. reads) distribuindo-os por um pool de processos
+        O índice só de leitura (c, occ e suffix array amostrado) é entregue a cada processo uma única vez, 
+        na sua inicialização, e não a cada tarefa
+        Parâmetros:
+            padroes (list[str]): Padrões a procurar
+            workers (int): Número de processos (1 procura sequencialmente no processo atual)
+            localizar (bool): Se True devolve as posições na sequência (locate) em vez das linhas da matriz (proc_padroes)
+        Retorna:
+            list[list[int]]: Resultado de cada padrão, pela ordem de entrada
+        """
+        if workers < 1:
+            raise ValueError('O número de processos deve ser positivo')
+        procurar = self.locate if localizar else self.proc_padroes
+        if workers == 1 or len(padroes) < 2:
+            return [procurar(padrao) for padrao in padroes]
+        # com fork o índice é herdado pelos processos sem ser copiado nem serializado
+        metodo = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        contexto = multiprocessing.get_context(metodo)
+        tamanho_lote = max(1, len(padroes) // (workers * 4))
+        with contexto.Pool(workers, initializer = _iniciar_processo, initargs = (self,)) as pool:
+            return pool.map(_proc_padrao_processo, ((padrao, localizar) for padrao in padroes), tamanho_lote)
+
+    def save(self, caminho : str):
+        """
+        Descrição: Guarda o índice (BWT, array c, tabela occ amostrada e suffix array amostrado) num ficheiro 
+        binário que pode ser mapeado em memória por load()
+        Formato (little-endian): cabeçalho ASSINATURA ('BWTIDX01', ou 'BWTINC01' para o índice incremental da 
+        sequência invertida) + n (uint64), taxa_occ, taxa_sa, nº de símbolos e nº de amostras (uint32),
+        seguido do array c, das contagens occ de cada símbolo, dos blocos e amostras do suffix array (uint32),
+        dos símbolos, do vetor de bits das linhas amostradas e da BWT (latin-1)
+        O índice é escrito num ficheiro temporário que só no fim substitui o caminho pedido, 
+        para que uma escrita interrompida não deixe um ficheiro incompleto
+        Parâmetros:
+            caminho (str): Caminho do ficheiro a criar
+        """
+        try:
+            bwt = str(self.bwt).encode('latin-1')
+        except UnicodeEncodeError:
+            raise ValueError('Só é possível guardar BWTs com símbolos latin-1')
+        simbolos = sorted(self.c)
+        inteiros = array('I', [self.c[car] for car in simbolos])
+        for car in simbolos:
+            inteiros.extend(self.occ[car])
+        inteiros.extend(self.sa_blocos)
+        inteiros.extend(self.sa_amostras)
+        if sys.byteorder == 'big':
+            inteiros.byteswap()
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        try:
+            with open(temporario, 'wb') as ficheiro:
+                ficheiro.write(self.ASSINATURA)
+                ficheiro.write(struct.pack('<QIIII', len(bwt), self.taxa_occ, self.taxa_sa, len(simbolos), len(self.sa_amostras)))
+                ficheiro.write(inteiros.tobytes())
+                ficheiro.write(''.join(simbolos).encode('latin-1'))
+                ficheiro.write(bytes(self.sa_marcas))
+                ficheiro.write(bwt)
+                ficheiro.flush()
+                os.fsync(ficheiro.fileno())
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    @classmethod
+    def load(cls, caminho : str, mmap : bool = True) -> 'BWT':
+        """
+        Descrição: Carrega um índice guardado por save()
+        Com mmap=True as tabelas e a BWT são vistas sobre o ficheiro mapeado em memória: o arranque é quase imediato 
+        e vários processos que carreguem o mesmo ficheiro partilham as mesmas páginas de memória
+        A sequência e o suffix array completo não são guardados: as posições obtêm-se com locate()
+        Parâmetros:
+            caminho (str): Caminho do ficheiro
+            mmap (bool): Se True mapeia o ficheiro em memória; caso contrário lê-o para a memória do processo
+        Retorna:
+            BWT: Índice carregado
+        """
+        with open(caminho, 'rb') as ficheiro:
+            if mmap:
+                dados = mapeamento.mmap(ficheiro.fileno(), 0, access = mapeamento.ACCESS_READ)
+            else:
+                dados = ficheiro.read()
+        try:
+            tipos = {BWT.ASSINATURA: BWT, BWTIncremental.ASSINATURA: BWTIncremental}
+            tipo = tipos.get(bytes(dados[:8]))
+            if tipo is None:
+                raise ValueError('O ficheiro não contém um índice BWT')
+            # BWT.load aceita qualquer tipo de índice; as subclasses só aceitam o seu
+            if cls is not BWT and cls is not tipo:
+                raise ValueError(f'O ficheiro contém um índice {tipo.__name__} e não {cls.__name__}')
+            try:
+                n, taxa_occ, taxa_sa, n_simbolos, n_amostras = struct.unpack_from('<QIIII', dados, 8)
+            except struct.error:
+                raise ValueError('O ficheiro do índice está truncado (cabeçalho incompleto)')
+            if taxa_occ == 0:
+                raise ValueError('O cabeçalho do índice é inválido (taxa_occ nula)')
+            n_occ = n // taxa_occ + 1
+            n_blocos = (n + 511) // 512
+            n_inteiros = n_simbolos * (1 + n_occ) + n_blocos + n_amostras
+            pos_simbolos = 32 + 4 * n_inteiros
+            pos_marcas = pos_simbolos + n_simbolos
+            pos_bwt = pos_marcas + (n + 7) // 8
+            # um ficheiro truncado ou escrito a meio carregaria sem erro e daria respostas erradas
+            if len(dados) != pos_bwt + n:
+                raise ValueError(f'O ficheiro do índice tem {len(dados)} bytes mas o cabeçalho indica {pos_bwt + n}')
+        except ValueError:
+            if mmap:
+                dados.close()
+            raise
+
+        vista = memoryview(dados)
+        if mmap and sys.byteorder == 'little':
+            inteiros = vista[32:pos_simbolos].cast('I')
+        else:
+            inteiros = array('I')
+            inteiros.frombytes(vista[32:pos_simbolos])
+            if sys.byteorder == 'big':
+                inteiros.byteswap()
+
+        indice = tipo.__new__(tipo)
+        indice.taxa_occ = taxa_occ
+        indice.taxa_sa = taxa_sa
+        indice.usar_numpy = np is not None
+        indice.seq = None
+        indice.suffix_array = None
+        indice.mapa = dados if mmap else None
+        indice.caminho = caminho
+        indice.reverso = None
+        indice.lcp = None
+        simbolos = bytes(vista[pos_simbolos:pos_marcas]).decode('latin-1')
+        indice.c = {car: inteiros[i] for i, car in enumerate(simbolos)}
+        indice.occ = {}
+        pos = n_simbolos
+        for car in simbolos:
+            indice.occ[car] = inteiros[pos:pos + n_occ]
+            pos += n_occ
+        indice.sa_blocos = inteiros[pos:pos + n_blocos]
+        indice.sa_amostras = inteiros[pos + n_blocos:pos + n_blocos + n_amostras]
+        if mmap:
+            indice.sa_marcas = vista[pos_marcas:pos_bwt]
+            indice.bwt = TextoMapeado(dados, pos_bwt, n)
+        else:
+            indice.sa_marcas = bytearray(vista[pos_marcas:pos_bwt])
+            indice.bwt = dados[pos_bwt:pos_bwt + n].decode('latin-1')
+        if tipo is BWTIncremental:
+            indice.tamanho = n - 1
+            ordem = sorted(indice.c, key = indice.c.get)
+            limites = [indice.c[car] for car in ordem[1:]] + [n]
+            indice.totais = {car: limite - indice.c[car] for car, limite in zip(ordem, limites)}
+        return indice
+
+    def __getstate__(self) -> dict:
+        """
+        Descrição: Estado usado para serializar o índice (e.g. para os processos de proc_padroes_batch com spawn)
+        Um índice mapeado em memória não pode ser serializado: guarda-se apenas o caminho do ficheiro, 
+        que é mapeado de novo pelo processo que o recebe
+        """
+        if getattr(self, 'mapa', None) is None:
+            return self.__dict__
+        return {'caminho': self.caminho, 'reverso': self.reverso}
+
+    def __setstate__(self, estado : dict):
+        """
+        Descrição: Reconstrói o índice serializado, mapeando de novo o ficheiro se tiver sido carregado com mmap
+        """
+        if 'bwt' not in estado:
+            self.__dict__.update(BWT.load(estado['caminho'], mmap = True).__dict__)
+            self.reverso = estado['reverso']
+        else:
+            self.__dict__.update(estado)
+
     def constr_suffix_array(self, seq : str) -> list[int]:
         """
-        Descrição: Constrói o suffix array para a sequência fornecida
+        Descrição: Constrói o suffix array para a sequência fornecida em tempo linear (SA-IS),
+        codificando cada símbolo pela sua ordem no alfabeto da sequência
         Parâmetros:
             seq (str): Sequência fornecida
         Returns:
             list[int]: O suffix array da sequência fornecida
         """
-        sufixos = sorted((seq[i:], i) for i in range(len(seq)))
-        return [sufixo[1] for sufixo in sufixos]
+        alfabeto = {car: i for i, car in enumerate(sorted(set(seq)))}
+        return sais([alfabeto[car] for car in seq], len(alfabeto) - 1)
     
+    def verificar_suffix_array(self):
+        """
+        Descrição: Garante que o índice guarda a sequência e o suffix array completo, necessários às procuras 
+        por pesquisa binária e ao array LCP (os índices carregados por load() e os incrementais não os guardam)
+        """
+        if self.seq is None or self.suffix_array is None:
+            raise ValueError('O índice não guarda a sequência e o suffix array completo')
+
+    def array_lcp(self) -> array:
+        """
+        Descrição: Obtém (construindo na primeira utilização) o array LCP do suffix array pelo algoritmo de Kasai: 
+        lcp[i] é o tamanho do maior prefixo comum entre os sufixos suffix_array[i - 1] e suffix_array[i]
+        Percorre os sufixos pela ordem do texto, aproveitando que o LCP diminui no máximo uma unidade de um para o seguinte
+        Retorna:
+            array: Array LCP (lcp[0] = 0)
+        """
+        self.verificar_suffix_array()
+        if self.lcp is None:
+            n = len(self.seq)
+            ordem = array('I', [0]) * n
+            for i, pos in enumerate(self.suffix_array):
+                ordem[pos] = i
+            lcp = array('I', [0]) * n
+            h = 0
+            for pos in range(n):
+                i = ordem[pos]
+                if i == 0:
+                    h = 0
+                    continue
+                anterior = self.suffix_array[i - 1]
+                while pos + h < n and anterior + h < n and self.seq[pos + h] == self.seq[anterior + h]:
+                    h += 1
+                lcp[i] = h
+                if h > 0:
+                    h -= 1
+            self.lcp = lcp
+        return self.lcp
+
+    def comparar_sufixo(self, padrao : str, pos : int, desde : int) -> tuple[int, int]:
+        """
+        Descrição: Compara o padrão com o sufixo que começa em pos, carácter a carácter a partir de desde, sem copiar o sufixo
+        Parâmetros:
+            padrao (str): O padrão a comparar
+            pos (int): Posição de início do sufixo
+            desde (int): Número de caracteres iniciais que já se sabe serem iguais
+        Retorna:
+            tuple[int, int]: Tamanho do prefixo comum e resultado da comparação (-1 se o padrão é menor, 
+                             0 se é prefixo do sufixo, 1 se é maior)
+        """
+        n, m = len(self.seq), len(padrao)
+        k = desde
+        while k < m and pos + k < n and padrao[k] == self.seq[pos + k]:
+            k += 1
+        if k == m:
+            return k, 0
+        if pos + k == n or padrao[k] > self.seq[pos + k]:
+            return k, 1
+        return k, -1
+
     def proc_padroes_sa(self, padrao : str) -> list[int]:
         """
         Descrição: Procura o padrão usando o suffix array, realizando pesquisa binária 
         para encontrar o intervalo de sufixos que contém o padrão e retorna os índices 
         dos sufixos na sequência original.
+        Usa a heurística mlr: os sufixos entre os dois limites partilham com o padrão pelo menos o menor dos 
+        prefixos comuns com os limites, pelo que cada comparação começa nesse carácter
         Parâmetros:
             padrao (str): O padrão a procurar
         Retorna:
             list[int]: Lista de índices dos sufixos que contêm o padrão a procurar
         """
+        self.verificar_suffix_array()
         esq, dir = 0, len(self.suffix_array)
+        lcp_esq = lcp_dir = 0
         while esq < dir:
             meio = (esq + dir) // 2
-            if padrao > self.seq[self.suffix_array[meio]:]:
-                esq = meio + 1
+            lcp_meio, comparacao = self.comparar_sufixo(padrao, self.suffix_array[meio], min(lcp_esq, lcp_dir))
+            if comparacao > 0:
+                esq, lcp_esq = meio + 1, lcp_meio
             else:
-                dir = meio
+                dir, lcp_dir = meio, lcp_meio
         inicio = esq
         dir = len(self.suffix_array)
+        lcp_dir = 0
         while esq < dir:
             meio = (esq + dir) // 2
-            if padrao < self.seq[self.suffix_array[meio]:self.suffix_array[meio] + len(padrao)]:
-                dir = meio
+            lcp_meio, comparacao = self.comparar_sufixo(padrao, self.suffix_array[meio], min(lcp_esq, lcp_dir))
+            if comparacao < 0:
+                dir, lcp_dir = meio, lcp_meio
             else:
-                esq = meio + 1
+                esq, lcp_esq = meio + 1, lcp_meio
         fim = dir
-        return sorted(self.suffix_array[inicio:fim])
\ No newline at end of file
+        return sorted(self.suffix_array[inicio:fim])
+
+    def repeticoes(self, tamanho_min : int = 1) -> list[tuple[str, list[int]]]:
+        """
+        Descrição: Enumera as repetições da sequência com pelo menos tamanho_min caracteres, percorrendo os 
+        intervalos LCP (enhanced suffix array): cada intervalo corresponde a um prefixo comum a dois ou mais sufixos 
+        consecutivos do suffix array que não pode ser estendido para a direita em todos eles
+        Parâmetros:
+            tamanho_min (int): Tamanho mínimo das repetições
+        Retorna:
+            list[tuple[str, list[int]]]: Repetições como (subsequência, posições ordenadas onde ocorre)
+        """
+        lcp = self.array_lcp()
+        n = len(lcp)
+        resultado = []
+        pilha = [(0, 0)]
+        for i in range(1, n + 1):
+            atual = lcp[i] if i < n else 0
+            inicio = i - 1
+            while atual < pilha[-1][0]:
+                valor, inicio = pilha.pop()
+                if valor >= max(tamanho_min, 1):
+                    pos = self.suffix_array[inicio]
+                    resultado.append((self.seq[pos:pos + valor], sorted(self.suffix_array[inicio:i])))
+            if atual > pilha[-1][0]:
+                pilha.append((atual, inicio))
+        return resultado
+
+    def repeticao_mais_longa(self) -> tuple[str, list[int]]:
+        """
+        Descrição: Obtém a maior subsequência que ocorre pelo menos duas vezes na sequência, a partir do maior valor do array LCP
+        Retorna:
+            tuple[str, list[int]]: Repetição mais longa e posições ordenadas onde ocorre ('', []) se não existir
+        """
+        lcp = self.array_lcp()
+        if not lcp or max(lcp) == 0:
+            return '', []
+        tamanho = max(lcp)
+        i = lcp.index(tamanho)
+        inicio, fim = i - 1, i + 1
+        while inicio > 0 and lcp[inicio] >= tamanho:
+            inicio -= 1
+        while fim < len(lcp) and lcp[fim] >= tamanho:
+            fim += 1
+        pos = self.suffix_array[i]
+        return self.seq[pos:pos + tamanho], sorted(self.suffix_array[inicio:fim])
+
+
+class BWTMulti(BWT):
+    """
+    Classe que implementa um índice BWT generalizado sobre várias sequências com nome (e.g. cromossomas), 
+    concatenadas com um separador, que traduz as posições encontradas para (nome da sequência, posição)
+    Os padrões que contêm o separador são rejeitados, pelo que nenhuma ocorrência atravessa duas sequências
+    """
+    def __init__(self, seqs : dict[str, str], separador : str = '|', taxa_occ : int = 32, taxa_sa : int = 32, 
+                 guardar_sa : bool = True):
+        """
+        Descrição: Construtor da classe BWTMulti
+        Parâmetros:
+            seqs (dict[str, str]): Sequências a indexar, por nome
+            separador (str): Símbolo colocado entre sequências consecutivas, que não pode ocorrer em nenhuma delas
+            taxa_occ (int): Intervalo entre as contagens guardadas na tabela de ocorrências (occ)
+            taxa_sa (int): Taxa de amostragem do suffix array
+            guardar_sa (bool): Se True guarda a sequência concatenada e o suffix array completo (proc_padroes_sa_seqs)
+        """
+        if len(separador) != 1 or separador <= '$':
+            raise ValueError('O separador deve ser um único símbolo maior que o marcador ($)')
+        self.separador = separador
+        self.nomes = list(seqs)
+        self.inicios = array('I')
+        pos = 0
+        for nome, seq in seqs.items():
+            if separador in seq or '$' in seq:
+                raise ValueError(f'A sequência {nome} contém o separador ou o marcador')
+            self.inicios.append(pos)
+            pos += len(seq) + 1
+        super().__init__(separador.join(seqs.values()), taxa_occ = taxa_occ, taxa_sa = taxa_sa, guardar_sa = guardar_sa)
+
+    def converter_posicao(self, pos : int) -> tuple[str, int]:
+        """
+        Descrição: Traduz uma posição do texto concatenado para a sequência que a contém, por pesquisa binária 
+        na tabela de inícios das sequências
+        Parâmetros:
+            pos (int): Posição no texto concatenado
+        Retorna:
+            tuple[str, int]: Nome da sequência e posição dentro dela
+        """
+        i = bisect_right(self.inicios, pos) - 1
+        return self.nomes[i], pos - self.inicios[i]
+
+    def intervalo_padrao(self, padrao : str) -> tuple[int, int]:
+        """
+        Descrição: Procura recuada do padrão, rejeitando padrões que contêm o separador
+        Parâmetros:
+            padrao (str): O padrão a procurar na BWT
+        Retorna:
+            tuple[int, int]: Primeira e última linhas (inclusivas) da matriz que começam pelo padrão
+        """
+        if self.separador in padrao:
+            return 0, -1
+        return super().intervalo_padrao(padrao)
+
+    def simbolos_substituicao(self) -> list[str]:
+        """
+        Descrição: Símbolos que podem substituir um símbolo do padrão na procura aproximada (exceto o marcador e o separador)
+        """
+        return [car for car in super().simbolos_substituicao() if car != self.separador]
+
+    def locate_seqs(self, padrao : str) -> list[tuple[str, int]]:
+        """
+        Descrição: Localiza o padrão e traduz cada ocorrência para (nome da sequência, posição)
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            list[tuple[str, int]]: Ocorrências do padrão, pela ordem das sequências e das posições
+        """
+        return [self.converter_posicao(pos) for pos in self.locate(padrao)]
+
+    def proc_smems_seqs(self, read : str, tamanho_min : int = 1, max_ocorrencias : int = None) -> list[tuple[int, int, list[tuple[str, int]]]]:
+        """
+        Descrição: Enumera os SMEMs entre o read e as sequências (que nunca atravessam o separador), traduzindo 
+        cada ocorrência para (nome da sequência, posição)
+        Parâmetros:
+            read (str): Read a comparar com as sequências
+            tamanho_min (int): Tamanho mínimo dos SMEMs devolvidos
+            max_ocorrencias (int): Se definido, os SMEMs com mais ocorrências são devolvidos sem posições (lista vazia)
+        Retorna:
+            list[tuple[int, int, list[tuple[str, int]]]]: SMEMs como (posição no read, tamanho, ocorrências), por posição no read
+        """
+        return [(inicio, tamanho, [self.converter_posicao(pos) for pos in posicoes])
+                for inicio, tamanho, posicoes in self.proc_smems(read, tamanho_min, max_ocorrencias)]
+
+    def proc_padroes_sa_seqs(self, padrao : str) -> list[tuple[str, int]]:
+        """
+        Descrição: Procura o padrão com o suffix array e traduz cada ocorrência para (nome da sequência, posição)
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            list[tuple[str, int]]: Ocorrências do padrão, pela ordem das sequências e das posições
+        """
+        if self.separador in padrao:
+            return []
+        return [self.converter_posicao(pos) for pos in self.proc_padroes_sa(padrao)]
+
+
+class RLBWT(BWT):
+    """
+    Classe que implementa a BWT codificada por runs (run-length encoding, à semelhança do r-index), 
+    com a procura e contagem de padrões feitas sobre os runs
+    Em referências repetitivas a memória depende do número de runs e não do tamanho da sequência
+    Não guarda o suffix array amostrado, pelo que locate(), proc_padroes_aprox(), proc_smems() e save() 
+    não estão disponíveis (lançam ValueError)
+    """
+    def __init__(self, seq : str = '', usar_matriz : bool = False):
+        """
+        Descrição: Construtor da classe RLBWT
+        Parâmetros:
+            seq (str): Sequência a inserir com ou sem marcador ('$') no final
+            usar_matriz (bool): Se True, a BWT é construída a partir da matriz de Burrows-Wheeler
+        """
+        self.seq = None
+        self.suffix_array = None
+        self.reverso = None
+        self.lcp = None
+        texto = seq if seq.endswith('$') or not seq else seq + '$'
+        if usar_matriz:
+            bwt = self.constr_bwt(texto)
+        else:
+            bwt = self.constr_bwt_sa(texto, self.ordenar_rotacoes(texto))
+        self.definir_bwt(bwt)
+
+    def definir_bwt(self, bwt : str):
+        """
+        Descrição: Atualiza a BWT com a string passada como entrada, codificando-a por runs
+        Parâmetros:
+            bwt (str): BWT a ser definida
+        """
+        self.bwt = TextoRuns(bwt)
+        self.c = self.constr_array_c()
+        self.reverso = None
+
+    def constr_array_c(self):
+        """
+        Descrição: Constrói o array c a partir do número total de ocorrências de cada símbolo nos seus runs
+        """
+        c = {}
+        total = 0
+        for car in sorted(self.bwt.runs):
+            c[car] = total
+            total += self.bwt.acumulado[car][-1]
+        return c
+
+    def ocorrencias(self, simbolo : str, i : int) -> int:
+        """
+        Descrição: Conta as ocorrências de um símbolo na BWT antes da posição i (rank) sobre os runs
+        Parâmetros:
+            simbolo (str): Símbolo a contar
+            i (int): Posição da BWT (exclusiva)
+        Retorna:
+            int: Número de ocorrências do símbolo em bwt[:i]
+        """
+        return self.bwt.ocorrencias(simbolo, i)
+
+    def n_runs(self) -> int:
+        """
+        Descrição: Número de runs da BWT
+        """
+        return len(self.bwt.cabecas)
+
+    def locate(self, padrao : str) -> list[int]:
+        """
+        Descrição: Indisponível: a RLBWT não guarda o suffix array amostrado (usar count ou proc_padroes)
+        """
+        raise ValueError('A RLBWT não guarda o suffix array amostrado: locate() não está disponível')
+
+    def proc_padroes_aprox(self, padrao : str, max_erros : int = 1) -> list[tuple[int, int]]:
+        """
+        Descrição: Indisponível: as posições das ocorrências aproximadas exigem o suffix array amostrado
+        """
+        raise ValueError('A RLBWT não guarda o suffix array amostrado: proc_padroes_aprox() não está disponível')
+
+    def proc_smems(self, read : str, tamanho_min : int = 1, max_ocorrencias : int = None) -> list[tuple[int, int, list[int]]]:
+        """
+        Descrição: Indisponível: as posições dos SMEMs exigem o suffix array amostrado
+        """
+        raise ValueError('A RLBWT não guarda o suffix array amostrado: proc_smems() não está disponível')
+
+    def save(self, caminho : str):
+        """
+        Descrição: Indisponível: o formato de save() guarda a tabela occ e o suffix array amostrado, que a RLBWT não tem
+        """
+        raise ValueError('Não é possível guardar uma RLBWT: o formato de save() exige a tabela occ e o suffix array amostrado')
+
+
+class BWTIncremental(BWT):
+    """
+    Classe que implementa um índice BWT que cresce à medida que chegam novos blocos de sequência
+    O índice é construído sobre a sequência invertida: acrescentar um bloco no fim da sequência corresponde a 
+    colocá-lo no início do texto indexado, o que deixa inalterados os sufixos já existentes. Os sufixos do bloco 
+    são ordenados entre si (SA-IS sobre o bloco) e intercalados com as linhas existentes numa única passagem
+    O suffix array amostrado guarda o tamanho de cada sufixo, que também não muda com novos blocos
+    Suporta proc_padroes, count, locate, proc_padroes_aprox, proc_smems e save entre acrescentos
+    As procuras com o suffix array completo (proc_padroes_sa, repeticoes) não estão disponíveis
+    """
+    ASSINATURA = b'BWTINC01'
+
+    def __init__(self, seq : str = '', taxa_occ : int = 32, taxa_sa : int = 32):
+        """
+        Descrição: Construtor da classe BWTIncremental
+        Parâmetros:
+            seq (str): Sequência inicial (sem marcador)
+            taxa_occ (int): Intervalo entre as contagens guardadas na tabela de ocorrências (occ)
+            taxa_sa (int): Guarda-se a entrada do suffix array dos sufixos cujo tamanho é múltiplo de taxa_sa
+        """
+        if taxa_occ < 1 or taxa_sa < 1:
+            raise ValueError('As taxas de amostragem devem ser positivas')
+        self.taxa_occ = taxa_occ
+        self.taxa_sa = taxa_sa
+        self.usar_numpy = np is not None
+        self.seq = None
+        self.suffix_array = None
+        self.reverso = None
+        self.lcp = None
+        self.tamanho = 0
+        # índice do texto vazio: apenas o marcador
+        self.bwt = '$'
+        self.totais = {'$': 1}
+        self.c = self.constr_array_c()
+        self.occ = self.constr_tabela_occ()
+        self.sa_marcas = bytearray([1 if taxa_sa == 1 else 0])
+        self.sa_blocos = array('I', [0])
+        self.sa_amostras = array('I', [1] if taxa_sa == 1 else [])
+        self.acrescentar(seq)
+
+    def constr_array_c(self):
+        """
+        Descrição: Constrói o array c a partir do número total de ocorrências de cada símbolo
+        """
+        c = {}
+        total = 0
+        for car in sorted(self.totais):
+            c[car] = total
+            total += self.totais[car]
+        return c
+
+    def acrescentar(self, seq : str):
+        """
+        Descrição: Acrescenta um bloco no fim da sequência indexada sem reconstruir a parte já existente
+        Para cada sufixo do bloco calcula-se, por LF mapping sobre o índice atual, o número de sufixos antigos 
+        menores (g); os sufixos do bloco são ordenados pelo texto de pares (g, símbolo) e intercalados com as 
+        linhas antigas, juntamente com as marcas e amostras do suffix array
+        Parâmetros:
+            seq (str): Bloco a acrescentar (sem marcador)
+        """
+        if not seq:
+            return
+        if '$' in seq:
+            raise ValueError('O bloco não pode conter o marcador ($)')
+        bloco = seq[::-1]
+        m = len(bloco)
+        n = len(self.bwt)
+
+        # número de sufixos antigos menores que cada sufixo do bloco (g[m] é o texto antigo completo)
+        menores = {}
+        for car in set(bloco) | set(self.totais):
+            menores[car] = sum(total for outro, total in self.totais.items() if outro < car)
+        g = array('I', [0]) * (m + 1)
+        g[m] = self.bwt.find('$')
+        for k in range(m - 1, -1, -1):
+            g[k] = menores[bloco[k]] + self.ocorrencias(bloco[k], g[k + 1])
+
+        # ordem relativa dos sufixos do bloco: suffix array do texto de pares (g, símbolo)
+        pares = [(g[k], ord(bloco[k])) for k in range(m)] + [(g[m], sys.maxunicode + 1)]
+        codigos = {par: i for i, par in enumerate(sorted(set(pares)))}
+        ordem = [k for k in sais([codigos[par] for par in pares], len(codigos) - 1) if k != m]
+
+        # intercalar a BWT, as marcas e as amostras antigas com as linhas do bloco
+        antiga = self.bwt[:g[m]] + bloco[-1] + self.bwt[g[m] + 1:]
+        marcas_antigas = bin(int.from_bytes(self.sa_marcas, 'little'))[2:].zfill(8 * len(self.sa_marcas))[::-1][:n]
+        bwt, marcas, amostras = [], [], array('I')
+        anterior, amostra_anterior = 0, 0
+        for k in ordem:
+            bwt.append(antiga[anterior:g[k]])
+            bwt.append(bloco[k - 1] if k else '$')
+            marcas.append(marcas_antigas[anterior:g[k]])
+            tamanho_sufixo = n + m - k
+            if tamanho_sufixo % self.taxa_sa == 0:
+                marcas.append('1')
+                indice = self.amostras_antes(g[k])
+                amostras.extend(self.sa_amostras[amostra_anterior:indice])
+                amostras.append(tamanho_sufixo)
+                amostra_anterior = indice
+            else:
+                marcas.append('0')
+            anterior = g[k]
+        bwt.append(antiga[anterior:])
+        marcas.append(marcas_antigas[anterior:])
+        amostras.extend(self.sa_amostras[amostra_anterior:])
+        marcas = ''.join(marcas)
+
+        self.bwt = ''.join(bwt)
+        self.reverso = None
+        self.mapa = None        # deixa de depender de um ficheiro carregado por load()
+        for car in bloco:
+            self.totais[car] = self.totais.get(car, 0) + 1
+        self.tamanho += m
+        self.c = self.constr_array_c()
+        self.occ = self.constr_tabela_occ()
+        self.sa_marcas = bytearray(int(marcas[::-1], 2).to_bytes((len(marcas) + 7) // 8, 'little'))
+        self.sa_blocos = array('I')
+        total = 0
+        for inicio in range(0, len(marcas), 512):
+            self.sa_blocos.append(total)
+            total += marcas.count('1', inicio, inicio + 512)
+        self.sa_amostras = amostras
+
+    def intervalo_padrao(self, padrao : str) -> tuple[int, int]:
+        """
+        Descrição: Procura recuada do padrão invertido no índice da sequência invertida
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            tuple[int, int]: Primeira e última linhas (inclusivas) da matriz que começam pelo padrão invertido
+        """
+        return super().intervalo_padrao(padrao[::-1])
+
+    def posicao(self, linha : int) -> int:
+        """
+        Descrição: Obtém o tamanho do sufixo de uma linha, seguindo o LF mapping até uma linha amostrada 
+        ou até ao sufixo que corresponde ao texto completo
+        Parâmetros:
+            linha (int): Linha da matriz
+        Retorna:
+            int: Tamanho do sufixo (incluindo o marcador)
+        """
+        passos = 0
+        while not self.amostrada(linha):
+            if self.bwt[linha] == '$':
+                return len(self.bwt) - passos
+            linha = self.lf(linha)
+            passos += 1
+        return self.sa_amostras[self.amostras_antes(linha)] - passos
+
+    def locate(self, padrao : str) -> list[int]:
+        """
+        Descrição: Procura o padrão e converte as linhas encontradas em posições na sequência acrescentada
+        Parâmetros:
+            padrao (str): O padrão a procurar
+        Retorna:
+            list[int]: Lista ordenada das posições da sequência onde o padrão ocorre
+        """
+        topo, fundo = self.intervalo_padrao(padrao)
+        return sorted(self.posicao(linha) - len(padrao) - 1 for linha in range(topo, fundo + 1))
+
+    def inverso_bwt(self) -> str:
+        """
+        Descrição: Recupera a sequência acrescentada até ao momento, terminada pelo marcador
+        Retorna:
+            str: Sequência original
+        """
+        return super().inverso_bwt()[-2::-1] + '$'
+
+    def indice_reverso(self) -> 'BWT':
+        """
+        Descrição: Obtém (construindo na primeira utilização após cada acrescento) o índice da sequência 
+        acrescentada, que é o inverso do texto indexado, usado pelo array D da procura aproximada
+        Retorna:
+            BWT: Índice da sequência (sem suffix array amostrado)
+        """
+        if self.reverso is None:
+            seq = self.inverso_bwt()[:-1]
+            self.reverso = BWT(seq, taxa_occ = self.taxa_occ, taxa_sa = len(seq) + 1, guardar_sa = False)
+        return self.reverso
+
+    def proc_padroes_aprox(self, padrao : str, max_erros : int = 1) -> list[tuple[int, int]]:
+        """
+        Descrição: Procura aproximada do padrão invertido no índice da sequência invertida, convertendo os 
+        tamanhos dos sufixos encontrados em posições na sequência acrescentada
+        Parâmetros:
+            padrao (str): O padrão a procurar
+            max_erros (int): Número máximo de substituições
+        Retorna:
+            list[tuple[int, int]]: Lista ordenada de pares (posição na sequência, número de substituições)
+        """
+        encontrados = super().proc_padroes_aprox(padrao[::-1], max_erros)
+        return sorted((tamanho - len(padrao) - 1, erros) for tamanho, erros in encontrados)
+
+    def proc_smems(self, read : str, tamanho_min : int = 1, max_ocorrencias : int = None) -> list[tuple[int, int, list[int]]]:
+        """
+        Descrição: Enumera os SMEMs entre o read e a sequência a partir dos SMEMs entre o read invertido e 
+        o texto indexado (a maximalidade não depende do sentido), convertendo posições no read e na sequência
+        Parâmetros:
+            read (str): Read a comparar com a sequência
+            tamanho_min (int): Tamanho mínimo dos SMEMs devolvidos
+            max_ocorrencias (int): Se definido, os SMEMs com mais ocorrências são devolvidos sem posições (lista vazia)
+        Retorna:
+            list[tuple[int, int, list[int]]]: SMEMs como (posição no read, tamanho, posições ordenadas na sequência), por posição no read
+        """
+        smems = super().proc_smems(read[::-1], tamanho_min, max_ocorrencias)
+        return sorted((len(read) - inicio - tamanho, tamanho, sorted(pos - tamanho - 1 for pos in posicoes))
+                      for inicio, tamanho, posicoes in smems)
@@ -0,0 +1,179 @@
+import random
+import sys
+import time
+from BWT import BWT, BWTIncremental
+
+def seq_aleatoria(tamanho : int, alfabeto : str = 'ACGT', semente : int = 0) -> str:
+    """
+    Descrição: Gera uma sequência aleatória reprodutível para os benchmarks
+    Parâmetros:
+        tamanho (int): Tamanho da sequência
+        alfabeto (str): Símbolos possíveis
+        semente (int): Semente do gerador aleatório
+    Retorna:
+        str: Sequência gerada
+    """
+    gerador = random.Random(semente)
+    return ''.join(gerador.choices(alfabeto, k = tamanho))
+
+def benchmark_suffix_array(tamanhos : tuple = (500_000, 1_000_000, 2_000_000, 4_000_000)):
+    """
+    Descrição: Mede o tempo de construção do suffix array (SA-IS) para referências de vários tamanhos.
+    O tempo por base deve manter-se aproximadamente constante (crescimento linear)
+    Parâmetros:
+        tamanhos (tuple): Tamanhos das referências a testar
+    """
+    bwt = BWT('')
+    print('Construção do suffix array (SA-IS)')
+    for tamanho in tamanhos:
+        seq = seq_aleatoria(tamanho)
+        inicio = time.perf_counter()
+        bwt.constr_suffix_array(seq)
+        duracao = time.perf_counter() - inicio
+        print(f'  n = {tamanho:>10,}: {duracao:8.2f} s ({duracao / tamanho * 1e6:.2f} µs/base)')
+
+def memoria_indice(bwt : BWT) -> dict[str, int]:
+    """
+    Descrição: Estima a memória (bytes) das estruturas de um índice BWT
+    Parâmetros:
+        bwt (BWT): Índice a medir
+    Retorna:
+        dict[str, int]: Memória da BWT, da tabela occ, do suffix array amostrado, da sequência e do suffix array completo
+    """
+    memoria = {
+        'bwt': sys.getsizeof(bwt.bwt),
+        'occ': sum(tabela.itemsize * len(tabela) for tabela in bwt.occ.values()),
+        'sa amostrado': len(bwt.sa_marcas) + bwt.sa_blocos.itemsize * len(bwt.sa_blocos) + bwt.sa_amostras.itemsize * len(bwt.sa_amostras),
+        'seq': sys.getsizeof(bwt.seq) if bwt.seq is not None else 0,
+        'sa completo': bwt.suffix_array.itemsize * len(bwt.suffix_array) if bwt.suffix_array is not None else 0
+    }
+    return memoria
+
+def benchmark_locate(tamanho : int = 200_000, n_padroes : int = 2_000, tamanho_padrao : int = 12, 
+                     taxas : tuple = (1, 4, 16, 32, 64, 128)):
+    """
+    Descrição: Compara a memória total do índice (sem guardar a sequência e o suffix array completo) e o tempo 
+    de localização para várias taxas de amostragem do suffix array
+    Parâmetros:
+        tamanho (int): Tamanho da referência
+        n_padroes (int): Número de padrões a localizar
+        tamanho_padrao (int): Tamanho de cada padrão
+        taxas (tuple): Taxas de amostragem (taxa_sa) a testar
+    """
+    seq = seq_aleatoria(tamanho)
+    gerador = random.Random(1)
+    padroes = [seq[i:i + tamanho_padrao] for i in gerador.choices(range(tamanho - tamanho_padrao), k = n_padroes)]
+    print(f'Localização com suffix array amostrado (n = {tamanho:,}, {n_padroes} padrões de {tamanho_padrao} bases)')
+    completo = memoria_indice(BWT(seq))
+    print(f'  guardar_sa = True acrescenta {(completo["seq"] + completo["sa completo"]) / 1024:.1f} KiB (sequência e suffix array completo)')
+    for taxa_sa in taxas:
+        bwt = BWT(seq, taxa_sa = taxa_sa, guardar_sa = False)
+        memoria = memoria_indice(bwt)
+        inicio = time.perf_counter()
+        for padrao in padroes:
+            bwt.locate(padrao)
+        duracao = time.perf_counter() - inicio
+        print(f'  k = {taxa_sa:>4}: total {sum(memoria.values()) / 1024:10.1f} KiB '
+              f'(sa amostrado {memoria["sa amostrado"] / 1024:8.1f} KiB), {duracao / n_padroes * 1e6:8.1f} µs/padrão')
+
+def benchmark_batch(tamanho : int = 1_000_000, n_reads : int = 100_000, tamanho_read : int = 36, 
+                    workers : tuple = (1, 2, 4, 8)):
+    """
+    Descrição: Mede o débito (reads por segundo) da procura em lote para vários números de processos
+    Parâmetros:
+        tamanho (int): Tamanho da referência
+        n_reads (int): Número de reads a procurar
+        tamanho_read (int): Tamanho de cada read
+        workers (tuple): Números de processos a testar
+    """
+    seq = seq_aleatoria(tamanho)
+    gerador = random.Random(2)
+    reads = [seq[i:i + tamanho_read] for i in gerador.choices(range(tamanho - tamanho_read), k = n_reads)]
+    bwt = BWT(seq)
+    print(f'Procura em lote (n = {tamanho:,}, {n_reads:,} reads de {tamanho_read} bases)')
+    for n_workers in workers:
+        inicio = time.perf_counter()
+        bwt.proc_padroes_batch(reads, workers = n_workers, localizar = True)
+        duracao = time.perf_counter() - inicio
+        print(f'  {n_workers:>2} processos: {n_reads / duracao:12,.0f} reads/s')
+
+def benchmark_aprox(tamanho : int = 200_000, n_reads : int = 300, tamanho_read : int = 36):
+    """
+    Descrição: Mede o tempo da procura aproximada (array D) em reads sintéticos com 0, 1 e 2 substituições,
+    comparando com a procura exata
+    Parâmetros:
+        tamanho (int): Tamanho da referência
+        n_reads (int): Número de reads por número de erros
+        tamanho_read (int): Tamanho de cada read
+    """
+    seq = seq_aleatoria(tamanho)
+    gerador = random.Random(3)
+    bwt = BWT(seq)
+    inicio = time.perf_counter()
+    bwt.indice_reverso()
+    print(f'Procura aproximada (n = {tamanho:,}, reads de {tamanho_read} bases, índice invertido em {time.perf_counter() - inicio:.2f} s)')
+    for erros_read in (0, 1, 2):
+        reads = []
+        for pos in gerador.choices(range(tamanho - tamanho_read), k = n_reads):
+            read = list(seq[pos:pos + tamanho_read])
+            for i in gerador.sample(range(tamanho_read), erros_read):
+                read[i] = gerador.choice([car for car in 'ACGT' if car != read[i]])
+            reads.append(''.join(read))
+        inicio = time.perf_counter()
+        for read in reads:
+            bwt.count(read)
+        exata = time.perf_counter() - inicio
+        tempos = []
+        for max_erros in (0, 1, 2):
+            inicio = time.perf_counter()
+            for read in reads:
+                bwt.proc_padroes_aprox(read, max_erros)
+            tempos.append(time.perf_counter() - inicio)
+        print(f'  reads com {erros_read} erros: exata {exata / n_reads * 1e6:8.1f} µs/read | ' + 
+              ' | '.join(f'k = {k}: {t / n_reads * 1e6:8.1f} µs/read' for k, t in enumerate(tempos)))
+
+def benchmark_incremental(tamanho_bloco : int = 50_000, n_blocos : int = 10):
+    """
+    Descrição: Compara o custo total de construir o índice à medida que chegam blocos de sequência: 
+    acrescentos ao índice incremental vs reconstrução completa do índice após cada bloco
+    Parâmetros:
+        tamanho_bloco (int): Tamanho de cada bloco
+        n_blocos (int): Número de blocos acrescentados
+    """
+    blocos = [seq_aleatoria(tamanho_bloco, semente = i) for i in range(n_blocos)]
+    print(f'Construção incremental ({n_blocos} blocos de {tamanho_bloco:,} bases)')
+    inicio = time.perf_counter()
+    incremental = BWTIncremental()
+    for bloco in blocos:
+        incremental.acrescentar(bloco)
+    duracao_incremental = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for i in range(1, n_blocos + 1):
+        BWT(''.join(blocos[:i]))
+    duracao_reconstrucao = time.perf_counter() - inicio
+    print(f'  incremental: {duracao_incremental:8.2f} s | reconstrução completa: {duracao_reconstrucao:8.2f} s')
+
+def benchmark_numpy(tamanho : int = 10_000_000, taxa_occ : int = 32):
+    """
+    Descrição: Compara a construção do array c e da tabela occ com NumPy e em Python puro sobre uma BWT de grande dimensão
+    Parâmetros:
+        tamanho (int): Tamanho da BWT
+        taxa_occ (int): Intervalo entre as contagens guardadas na tabela occ
+    """
+    print(f'Construção de c e occ (n = {tamanho:,}, taxa_occ = {taxa_occ})')
+    for usar_numpy in (False, True):
+        bwt = BWT('', taxa_occ = taxa_occ, usar_numpy = usar_numpy)
+        bwt.bwt = seq_aleatoria(tamanho, 'ACGT$')
+        inicio = time.perf_counter()
+        bwt.constr_array_c()
+        bwt.constr_tabela_occ()
+        duracao = time.perf_counter() - inicio
+        print(f'  {"NumPy" if bwt.usar_numpy else "Python"}: {duracao:8.2f} s')
+
+if __name__ == '__main__':
+    benchmark_suffix_array()
+    benchmark_locate()
+    benchmark_batch()
+    benchmark_aprox()
+    benchmark_incremental()
+    benchmark_numpy()
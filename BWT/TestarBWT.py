@@ -1,5 +1,9 @@
+import os
+import pickle
+import random
+import tempfile
 import unittest
-from BWT import BWT
+from BWT import BWT, BWTIncremental, BWTMulti, RLBWT, np
 
 seqs_para_bwts = {'' : '', 
              '$' : '$', 
@@ -46,12 +50,47 @@ class TestarBWT(unittest.TestCase):
             bwt = BWT(seq_teste)
             self.assertEqual(bwt.bwt, bwt_teste)
 
+    def testar_constr_bwt_sa(self):
+        gerador = random.Random(1)
+        seqs = list(seqs_para_bwts) + [''.join(gerador.choices('ACGT$#', k = gerador.randint(1, 40))) for _ in range(200)]
+        for seq_teste in seqs:
+            self.assertEqual(BWT(seq_teste).bwt, BWT(seq_teste, usar_matriz = True).bwt)
+
     def testar_inverso_bwt(self):
         for bwt_teste, seq_teste in bwts_para_seqs.items():
             bwt = BWT('')
             bwt.definir_bwt(bwt_teste)
             self.assertEqual(bwt.inverso_bwt(), seq_teste)
 
+    def testar_ocorrencias(self):
+        seq = ''.join(random.Random(2).choices('ACGT', k = 300))
+        for taxa_occ in (1, 4, 32, 1000):
+            bwt = BWT(seq, taxa_occ = taxa_occ)
+            for simbolo in 'ACGT$N':
+                for i in range(len(bwt.bwt) + 1):
+                    self.assertEqual(bwt.ocorrencias(simbolo, i), bwt.bwt[:i].count(simbolo))
+
+    def testar_proc_padroes_taxa_occ(self):
+        for taxa_occ in (1, 3, 64):
+            for seq, padrao, indices in exemplos_padroes:
+                self.assertEqual(BWT(seq, taxa_occ = taxa_occ).proc_padroes(padrao), indices)
+
+    def testar_inverso_bwt_longo(self):
+        seq = ''.join(random.Random(5).choices('ACGT', k = 20000)) + '$'
+        bwt = BWT('')
+        bwt.definir_bwt(BWT(seq).bwt)
+        self.assertEqual(bwt.inverso_bwt(), seq)
+
+    @unittest.skipIf(np is None, 'NumPy não está instalado')
+    def testar_numpy(self):
+        gerador = random.Random(12)
+        for seq in list(seqs_para_bwts) + [''.join(gerador.choices('ACGTN', k = 1000)), 'Ação$']:
+            for taxa_occ in (1, 7, 32):
+                vetorizada = BWT(seq, taxa_occ = taxa_occ)
+                python = BWT(seq, taxa_occ = taxa_occ, usar_numpy = False)
+                self.assertEqual(vetorizada.c, python.c)
+                self.assertEqual(vetorizada.occ, python.occ)
+
     def testar_proc_padroes(self):
         for exemplo in exemplos_padroes:
             seq, padrao, indices = exemplo
@@ -59,6 +98,13 @@ class TestarBWT(unittest.TestCase):
         bwt.bwt
         self.assertEqual(bwt.proc_padroes(padrao), indices)
 
+    def testar_count(self):
+        seq = ''.join(random.Random(3).choices('ACGT', k = 500))
+        bwt = BWT(seq, taxa_occ = 8)
+        for padrao in ('A', 'CG', 'TTA', 'GATTACA', 'N', 'AN', ''):
+            self.assertEqual(bwt.count(padrao), len(bwt.proc_padroes(padrao)))
+            self.assertEqual(bwt.count(padrao), sum(seq.startswith(padrao, i) for i in range(len(seq) + 1)) if padrao else len(bwt.bwt))
+
     def testar_proc_padroes_sa(self):
         for exemplo in exemplos_padroes_sa:
             seq, padrao, indices = exemplo
@@ -66,5 +112,276 @@ class TestarBWT(unittest.TestCase):
         bwt.bwt
         self.assertEqual(bwt.proc_padroes_sa(padrao), indices)
 
+    def testar_constr_suffix_array(self):
+        gerador = random.Random(0)
+        bwt = BWT('')
+        for _ in range(200):
+            seq = ''.join(gerador.choices('ACGT$', k = gerador.randint(0, 60)))
+            esperado = [i for _, i in sorted((seq[i:], i) for i in range(len(seq)))]
+            self.assertEqual(bwt.constr_suffix_array(seq), esperado)
+
+    def testar_locate(self):
+        gerador = random.Random(4)
+        seq = ''.join(gerador.choices('ACGT', k = 2000))
+        padroes = ['A', 'GAT', 'CGTA', seq[100:112], 'N'] + [seq[i:i + 5] for i in gerador.sample(range(1995), 20)]
+        for taxa_sa in (1, 5, 32, 3000):
+            bwt = BWT(seq, taxa_sa = taxa_sa)
+            for padrao in padroes:
+                self.assertEqual(bwt.locate(padrao), bwt.proc_padroes_sa(padrao))
+        for seq, padrao, indices in exemplos_padroes_sa:
+            self.assertEqual(BWT(seq, usar_matriz = True, taxa_sa = 2).locate(padrao), indices)
+
+    def testar_sem_suffix_array(self):
+        gerador = random.Random(5)
+        seq = ''.join(gerador.choices('ACGT', k = 1000))
+        completo = BWT(seq, taxa_sa = 16)
+        self.assertEqual(completo.suffix_array.typecode, 'I')
+        compacto = BWT(seq, taxa_sa = 16, guardar_sa = False)
+        self.assertIsNone(compacto.seq)
+        self.assertIsNone(compacto.suffix_array)
+        for padrao in ('A', 'GAT', seq[100:112], 'N'):
+            self.assertEqual(compacto.locate(padrao), completo.proc_padroes_sa(padrao))
+        with self.assertRaises(ValueError):
+            compacto.proc_padroes_sa('GAT')
+
+    def testar_proc_padroes_batch(self):
+        gerador = random.Random(6)
+        seq = ''.join(gerador.choices('ACGT', k = 3000))
+        bwt = BWT(seq)
+        padroes = [seq[i:i + 6] for i in gerador.sample(range(2990), 50)] + ['N', 'ACGTACGTACGT']
+        for workers in (1, 2):
+            self.assertEqual(bwt.proc_padroes_batch(padroes, workers = workers), [bwt.proc_padroes(p) for p in padroes])
+            self.assertEqual(bwt.proc_padroes_batch(padroes, workers = workers, localizar = True), [bwt.locate(p) for p in padroes])
+
+    def testar_save_load(self):
+        gerador = random.Random(7)
+        seq = ''.join(gerador.choices('ACGT', k = 5000))
+        bwt = BWT(seq, taxa_occ = 16, taxa_sa = 8)
+        padroes = [seq[i:i + 7] for i in gerador.sample(range(4990), 30)] + ['A', 'N', '']
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'indice.bwt')
+            bwt.save(caminho)
+            for mmap in (True, False):
+                carregada = BWT.load(caminho, mmap = mmap)
+                self.assertEqual(str(carregada.bwt), bwt.bwt)
+                self.assertEqual(carregada.c, bwt.c)
+                self.assertEqual(carregada.inverso_bwt(), seq + '$')
+                for padrao in padroes:
+                    self.assertEqual(carregada.proc_padroes(padrao), bwt.proc_padroes(padrao))
+                    self.assertEqual(carregada.locate(padrao), bwt.locate(padrao))
+                del carregada
+
+    def testar_load_truncado(self):
+        seq = ''.join(random.Random(9).choices('ACGT', k = 400))
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'indice.bwt')
+            BWT(seq).save(caminho)
+            self.assertEqual(os.listdir(pasta), ['indice.bwt'])
+            with open(caminho, 'rb') as ficheiro:
+                dados = ficheiro.read()
+            for tamanho in (4, 20, 40, len(dados) - 10, len(dados) - 1):
+                with open(caminho, 'wb') as ficheiro:
+                    ficheiro.write(dados[:tamanho])
+                for mmap in (True, False):
+                    with self.assertRaises(ValueError):
+                        BWT.load(caminho, mmap = mmap)
+            with open(caminho, 'wb') as ficheiro:
+                ficheiro.write(dados + b'A')
+            with self.assertRaises(ValueError):
+                BWT.load(caminho, mmap = False)
+
+    def testar_load_serializar(self):
+        gerador = random.Random(8)
+        seq = ''.join(gerador.choices('ACGT', k = 2000))
+        padroes = [seq[i:i + 6] for i in range(0, 200, 10)]
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'indice.bwt')
+            BWT(seq, taxa_sa = 8).save(caminho)
+            carregada = BWT.load(caminho)
+            copia = pickle.loads(pickle.dumps(carregada))
+            self.assertIsNotNone(copia.mapa)
+            self.assertEqual([copia.locate(padrao) for padrao in padroes], [carregada.locate(padrao) for padrao in padroes])
+            BWTIncremental(seq[:500]).save(caminho)
+            incremental = pickle.loads(pickle.dumps(BWT.load(caminho, mmap = False)))
+            self.assertIsInstance(incremental, BWTIncremental)
+            self.assertEqual(incremental.locate(seq[100:106]), BWT(seq[:500]).locate(seq[100:106]))
+            del carregada, copia
+
+    def testar_proc_padroes_aprox(self):
+        gerador = random.Random(8)
+        seq = ''.join(gerador.choices('ACGT', k = 1500))
+        bwt = BWT(seq, taxa_sa = 4)
+        for _ in range(20):
+            inicio = gerador.randrange(1490)
+            padrao = list(seq[inicio:inicio + 8])
+            padrao[gerador.randrange(8)] = gerador.choice('ACGT')
+            padrao = ''.join(padrao)
+            for max_erros in (0, 1, 2):
+                esperado = []
+                for i in range(len(seq) - 7):
+                    erros = sum(a != b for a, b in zip(seq[i:i + 8], padrao))
+                    if erros <= max_erros:
+                        esperado.append((i, erros))
+                self.assertEqual(bwt.proc_padroes_aprox(padrao, max_erros), esperado)
+        # reads mais longos que o limite de recursão do Python
+        read = list(seq[100:1300])
+        read[600] = 'A' if read[600] != 'A' else 'C'
+        read = ''.join(read)
+        self.assertEqual(bwt.proc_padroes_aprox(read, 1), [(100, 1)])
+        self.assertEqual(bwt.proc_padroes_aprox(read, 0), [])
+
+    def testar_rlbwt(self):
+        gerador = random.Random(9)
+        unidade = ''.join(gerador.choices('ACGT', k = 50))
+        seqs = list(seqs_para_bwts) + [unidade * 40, ''.join(gerador.choices('ACGT', k = 300))]
+        for seq in seqs:
+            bwt, rlbwt = BWT(seq), RLBWT(seq)
+            self.assertEqual(str(rlbwt.bwt), bwt.bwt)
+            self.assertEqual(rlbwt.c, bwt.c)
+            self.assertEqual(rlbwt.inverso_bwt(), bwt.inverso_bwt())
+            for padrao in ('A', 'AGA', unidade[:10], unidade + unidade[:5], 'N', ''):
+                self.assertEqual(rlbwt.proc_padroes(padrao), bwt.proc_padroes(padrao))
+                self.assertEqual(rlbwt.count(padrao), bwt.count(padrao))
+        self.assertLess(RLBWT(unidade * 40).n_runs(), 200)
+
+    def testar_rlbwt_indisponiveis(self):
+        rlbwt = RLBWT('ACGTTGCAACGGTACCAGT' * 3)
+        with self.assertRaises(ValueError):
+            rlbwt.locate('GCAA')
+        with self.assertRaises(ValueError):
+            rlbwt.locate('NNN')
+        with self.assertRaises(ValueError):
+            rlbwt.proc_padroes_aprox('GCAA', 1)
+        with self.assertRaises(ValueError):
+            rlbwt.proc_smems('TTGCAAC', 3)
+        with self.assertRaises(ValueError):
+            rlbwt.proc_padroes_sa('GCAA')
+        with tempfile.TemporaryDirectory() as pasta:
+            with self.assertRaises(ValueError):
+                rlbwt.save(os.path.join(pasta, 'rlbwt.bwt'))
+
+    def testar_rlbwt_definir_bwt(self):
+        for bwt_teste, seq_teste in bwts_para_seqs.items():
+            rlbwt = RLBWT('')
+            rlbwt.definir_bwt(bwt_teste)
+            self.assertEqual(rlbwt.inverso_bwt(), seq_teste)
+
+    def testar_bwt_multi(self):
+        gerador = random.Random(10)
+        seqs = {f'chr{i}': ''.join(gerador.choices('ACGT', k = gerador.randint(1, 400))) for i in range(1, 6)}
+        seqs['chrM'] = 'ACGT'
+        bwt = BWTMulti(seqs, taxa_sa = 4)
+        padroes = ['ACGT', 'A', 'GATC', seqs['chr2'][-3:] + seqs['chr3'][:3], 'A|C', 'TTTT']
+        for padrao in padroes:
+            esperado = [(nome, i) for nome, seq in seqs.items() for i in range(len(seq)) if seq.startswith(padrao, i)]
+            self.assertEqual(bwt.locate_seqs(padrao), esperado)
+            self.assertEqual(bwt.proc_padroes_sa_seqs(padrao), esperado)
+            self.assertEqual(bwt.count(padrao), len(esperado))
+        for pos, erros in bwt.proc_padroes_aprox('ACGTA', 2):
+            nome, i = bwt.converter_posicao(pos)
+            self.assertLessEqual(i + 5, len(seqs[nome]))
+        with self.assertRaises(ValueError):
+            BWTMulti({'a': 'AC|GT'})
+
+    def testar_bwt_multi_smems(self):
+        bwt = BWTMulti({'a': 'ACGT', 'b': 'TTGA'})
+        self.assertEqual(bwt.proc_smems('GT|TT', 1), [(0, 2, [2]), (3, 2, [5])])
+        self.assertEqual(bwt.proc_smems_seqs('GT|TT', 1), [(0, 2, [('a', 2)]), (3, 2, [('b', 0)])])
+        self.assertEqual(bwt.proc_smems_seqs('CGTTTG', 3), [(0, 3, [('a', 1)]), (3, 3, [('b', 0)])])
+
+    def testar_bwt_incremental(self):
+        gerador = random.Random(11)
+        for taxa_sa in (1, 3, 32):
+            incremental = BWTIncremental(taxa_occ = 4, taxa_sa = taxa_sa)
+            seq = ''
+            for _ in range(6):
+                bloco = ''.join(gerador.choices('ACGT', k = gerador.randint(1, 300)))
+                incremental.acrescentar(bloco)
+                seq += bloco
+                self.assertEqual(incremental.bwt, BWT(seq[::-1]).bwt)
+                bwt = BWT(seq)
+                for padrao in ('A', 'CGT', seq[3:10], seq[-6:], 'N'):
+                    self.assertEqual(incremental.count(padrao), bwt.count(padrao))
+                    self.assertEqual(incremental.locate(padrao), bwt.locate(padrao))
+            self.assertEqual(incremental.inverso_bwt(), seq + '$')
+
+    def testar_bwt_incremental_consultas(self):
+        seq = 'ACGTTGCAACGGTACCAGT' * 3
+        incremental = BWTIncremental(seq[:20], taxa_sa = 4)
+        incremental.acrescentar(seq[20:])
+        bwt = BWT(seq, taxa_sa = 4)
+        self.assertEqual(incremental.proc_padroes_aprox('GCAA', 0), [(5, 0), (24, 0), (43, 0)])
+        for padrao in ('GCTA', 'TTGCAAG', 'CCAGTAC'):
+            self.assertEqual(incremental.proc_padroes_aprox(padrao, 1), bwt.proc_padroes_aprox(padrao, 1))
+        self.assertEqual(incremental.proc_smems('TTGCAAC', 3), [(0, 7, [3, 22, 41])])
+        self.assertEqual(incremental.proc_smems('TTGNAACGGTAGG', 2), bwt.proc_smems('TTGNAACGGTAGG', 2))
+        with self.assertRaises(ValueError):
+            incremental.proc_padroes_sa('GCAA')
+        with self.assertRaises(ValueError):
+            incremental.repeticoes()
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'incremental.bwt')
+            incremental.save(caminho)
+            for mmap in (True, False):
+                carregada = BWT.load(caminho, mmap = mmap)
+                self.assertIsInstance(carregada, BWTIncremental)
+                self.assertEqual(carregada.locate('GCAA'), [5, 24, 43])
+                carregada.acrescentar('GCAAT')
+                self.assertEqual(carregada.locate('GCAA'), BWT(seq + 'GCAAT').locate('GCAA'))
+                del carregada
+            bwt.save(caminho)
+            with self.assertRaises(ValueError):
+                BWTIncremental.load(caminho)
+
+    def testar_proc_smems(self):
+        gerador = random.Random(13)
+        seq = ''.join(gerador.choices('ACGT', k = 800))
+        bwt = BWT(seq, taxa_sa = 4)
+        for _ in range(10):
+            inicio = gerador.randrange(700)
+            read = list(seq[inicio:inicio + 60])
+            for i in gerador.sample(range(60), 3):
+                read[i] = 'N' if i % 2 else gerador.choice('ACGT')
+            read = ''.join(read)
+            # maior match que termina em cada posição do read, por força bruta
+            inicios = []
+            for fim in range(len(read)):
+                s = fim + 1
+                while s > 0 and read[s - 1:fim + 1] in seq:
+                    s -= 1
+                inicios.append(s)
+            esperado = []
+            for fim, s in enumerate(inicios):
+                if fim + 1 > s and (fim == len(read) - 1 or inicios[fim + 1] > s) and fim + 1 - s >= 5:
+                    posicoes = [i for i in range(len(seq)) if seq.startswith(read[s:fim + 1], i)]
+                    esperado.append((s, fim + 1 - s, posicoes))
+            self.assertEqual(bwt.proc_smems(read, tamanho_min = 5), esperado)
+
+    def testar_array_lcp(self):
+        gerador = random.Random(14)
+        for seq in ['', 'A', 'banana', 'TAGACAGAGA$'] + [''.join(gerador.choices('ACG', k = 200)) for _ in range(5)]:
+            bwt = BWT(seq)
+            lcp = bwt.array_lcp()
+            for i in range(1, len(seq)):
+                a, b = seq[bwt.suffix_array[i - 1]:], seq[bwt.suffix_array[i]:]
+                esperado = next((k for k in range(min(len(a), len(b))) if a[k] != b[k]), min(len(a), len(b)))
+                self.assertEqual(lcp[i], esperado)
+
+    def testar_proc_padroes_sa_aleatorio(self):
+        gerador = random.Random(15)
+        seq = ''.join(gerador.choices('ACGT', k = 1000))
+        bwt = BWT(seq)
+        for padrao in ['A', 'ACG', seq[-3:], seq[:9], 'TTTTTTTTT', 'N', ''] + [seq[i:i + 6] for i in gerador.sample(range(994), 20)]:
+            self.assertEqual(bwt.proc_padroes_sa(padrao), [i for i in range(len(seq)) if seq.startswith(padrao, i)])
+
+    def testar_repeticoes(self):
+        bwt = BWT('GATTACAGATTACATTAC')
+        self.assertEqual(bwt.repeticao_mais_longa(), ('GATTACA', [0, 7]))
+        repeticoes = dict(bwt.repeticoes(4))
+        self.assertEqual(repeticoes['GATTACA'], [0, 7])
+        self.assertEqual(repeticoes['TTAC'], [2, 9, 14])
+        self.assertTrue(all(len(rep) >= 4 for rep in repeticoes))
+        self.assertEqual(BWT('ACGT').repeticao_mais_longa(), ('', []))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
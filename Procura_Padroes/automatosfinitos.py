@@ -1,6 +1,10 @@
 from graphviz import Digraph
 from IPython.display import display
-from collections import deque
+from collections import deque, OrderedDict
+from array import array
+from itertools import groupby
+from operator import itemgetter
+from procurapadroes import fasta_chunks
 
 class FiniteAutomata:
     """
@@ -10,22 +14,50 @@ class FiniteAutomata:
     This class provides functionality for constructing a DFA transition function table
     from a given pattern and searching for patterns in text using the constructed DFA.
     """
-    def __init__(self):
+    def __init__(self, cache_capacity=128):
         """
         Initializes a FiniteAutomata object.
+
+        Args:
+            cache_capacity (int, optional): Maximum number of compiled patterns kept in the LRU cache.
+            0 disables the cache. Default is 128.
         """
+        if cache_capacity < 0:
+            raise ValueError("Cache capacity cannot be negative.")
+        self.cache_capacity = cache_capacity
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.NO_OF_CHARS = 256
         self.Q = set()
         self.sigma = set()
         self.q_0 = 0
         self.F = set()
-        self.delta = {}
+        self.alphabet = []
+        self.char_map = array('H', [0]) * self.NO_OF_CHARS
         self.TF = []
+        self._delta = None
+
+    @property
+    def delta(self):
+        """
+        Transition function as a dictionary {(state, char): next_state} without the transitions to state 0.
+        It is only built when requested (e.g. by print_dfa or visualize_dfa) and cached until the table changes.
+        """
+        if self._delta is None:
+            self._delta = {(i, char): row[k] for i, row in enumerate(self.TF)
+                           for k, char in enumerate(self.alphabet) if row[k] != 0}
+        return self._delta
 
     def compute_transition_func(self, pat):
         """
         Constructs the transition function table for a given pattern.
 
+        The table only has one column per distinct character of the pattern plus one shared column for
+        every other character (which always leads to state 0). self.char_map maps each character code to
+        its column. Compiled tables are kept in an LRU cache keyed by pattern and alphabet size, so
+        recompiling a recently used pattern only restores its table.
+
         Args:
             pat (str): The pattern string.
         """
@@ -33,34 +65,79 @@ class FiniteAutomata:
             raise ValueError("Pattern cannot be empty.")
 
         M = len(pat)
-        self.TF = [[0 for _ in range(self.NO_OF_CHARS)] for _ in range(M + 1)]
+        key = (pat, self.NO_OF_CHARS)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            self.TF, self.char_map, self.alphabet = self.cache[key]
+            self.update_components(pat)
+            return
+        self.cache_misses += 1
+
+        self.alphabet = sorted(set(pat))
+        if ord(self.alphabet[-1]) >= self.NO_OF_CHARS:
+            raise ValueError("Pattern contains characters outside the alphabet.")
+        other = len(self.alphabet)
+        self.char_map = array('H', [other]) * self.NO_OF_CHARS
+        for k, char in enumerate(self.alphabet):
+            self.char_map[ord(char)] = k
+        cols = [self.char_map[ord(char)] for char in pat]
+
+        self.TF = [array('i', [0]) * (other + 1)]
         lps = 0  # Longest Prefix Suffix
 
         # Initialize the first row of the TF table
-        for x in range(self.NO_OF_CHARS):
-            self.TF[0][x] = 0
-        self.TF[0][ord(pat[0])] = 1
+        self.TF[0][cols[0]] = 1
 
         # Fill the entries in the rest of the TF table
         for i in range(1, M + 1):
             # Copy the values from the row at index lps
-            for x in range(self.NO_OF_CHARS):
-                self.TF[i][x] = self.TF[lps][x]
+            self.TF.append(array('i', self.TF[lps]))
 
             if i < M:
                 # Update the entry corresponding to the current character
-                self.TF[i][ord(pat[i])] = i + 1
+                self.TF[i][cols[i]] = i + 1
 
                 # Update lps for the next row to be filled
-                lps = self.TF[lps][ord(pat[i])]
+                lps = self.TF[lps][cols[i]]
+
+        if self.cache_capacity:
+            self.cache[key] = (self.TF, self.char_map, self.alphabet)
+            if len(self.cache) > self.cache_capacity:
+                self.cache.popitem(last=False)
+        self.update_components(pat)
 
-        # Update the DFA components
+    def update_components(self, pat):
+        """
+        Updates the DFA components for the pattern whose transition table is loaded.
+
+        Args:
+            pat (str): The pattern string.
+        """
+        M = len(pat)
         self.Q = {i for i in range(M + 1)}
         self.sigma = {pat[i] for i in range(M)}
         self.q_0 = 0
         self.F = {M}
-        self.delta = {(i, chr(x)): self.TF[i][x] for i in range(M + 1) for x in range(self.NO_OF_CHARS) if
-                      self.TF[i][x] != 0}
+        self._delta = None
+
+    def cache_info(self):
+        """
+        Returns the statistics of the compiled-pattern cache.
+
+        Returns:
+            dict: Number of hits, misses, cached patterns and the cache capacity.
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses,
+                "size": len(self.cache), "capacity": self.cache_capacity}
+
+    def clear_cache(self):
+        """
+        Removes every compiled pattern from the cache and resets its counters.
+        """
+        self.cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def search(self, patterns, txt, preprocessing=True):
         """
@@ -88,19 +165,91 @@ class FiniteAutomata:
         results = {pat: [] for pat in patterns}
 
         for pat in patterns:
-            M = len(pat)
-            N = len(txt)
             self.compute_transition_func(pat)
+            results[pat], _ = self.run(txt)
+
+        return results
 
-            # Process text using the FA
-            j = self.q_0  # State of the FA
+    def run(self, txt, state=0, offset=0):
+        """
+        Runs the loaded transition table over a text.
 
-            for i in range(N):
-                j = self.TF[j][ord(txt[i])]
-                if j == M:
-                    results[pat].append(i - M + 1)
+        Args:
+            txt (str): The text string to process.
+            state (int, optional): The state of the FA before the first character. Default is 0.
+            offset (int, optional): Position of the first character of txt in the whole text. Default is 0.
 
-        return results
+        Returns:
+            tuple: The list of starting indices of the matches (shifted by offset) and the final state.
+        """
+        M = len(self.TF) - 1
+        matches = []
+        TF, char_map, other = self.TF, self.char_map, len(self.alphabet)
+        for i in range(len(txt)):
+            code = ord(txt[i])
+            state = TF[state][char_map[code] if code < self.NO_OF_CHARS else other]
+            if state == M:
+                matches.append(offset + i - M + 1)
+        return matches, state
+
+    def search_stream(self, patterns, chunks, preprocessing=True, chunk_size=1 << 20, fasta=False):
+        """
+        Searches for multiple patterns in a text given in chunks, keeping only one chunk in memory.
+
+        The state of each pattern's automaton is carried across chunk boundaries, so matches that span
+        two chunks are found. Matches are yielded as soon as the chunk where they end is processed.
+
+        Args:
+            patterns (list of str): The list of pattern strings.
+            chunks (iterable of str or file object): The text, as an iterable of chunks or a text file opened for reading.
+            preprocessing (bool, optional): Whether to preprocess the text and patterns. Default is True.
+            chunk_size (int, optional): Number of characters read at a time from a file object. Default is 1 MiB.
+            fasta (bool, optional): If True, chunks is a FASTA file object read with fasta_chunks (headers and
+            line breaks skipped) and each record is searched separately. Default is False.
+
+        Yields:
+            tuple: (pattern, starting index) of each match in the whole text.
+            With fasta=True, (record name, pattern, starting index in the record's sequence) instead.
+        """
+        if not patterns:
+            raise ValueError("Patterns list cannot be empty.")
+
+        if fasta:
+            records = groupby(fasta_chunks(chunks, chunk_size), key=itemgetter(0))
+        elif hasattr(chunks, "read"):
+            read = chunks.read
+            chunks = iter(lambda: read(chunk_size), "")
+
+        if preprocessing:
+            patterns = [self.preprocess_text(pat) for pat in patterns]
+
+        # Compile every pattern once and keep its table for the whole stream
+        tables = {}
+        for pat in dict.fromkeys(patterns):
+            self.compute_transition_func(pat)
+            tables[pat] = (self.TF, self.char_map, self.alphabet)
+
+        def scan(chunks):
+            states = dict.fromkeys(tables, self.q_0)
+            offset = 0
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if preprocessing:
+                    chunk = self.preprocess_text(chunk)
+                for pat in tables:
+                    self.TF, self.char_map, self.alphabet = tables[pat]
+                    matches, states[pat] = self.run(chunk, states[pat], offset)
+                    for pos in matches:
+                        yield pat, pos
+                offset += len(chunk)
+
+        if not fasta:
+            yield from scan(chunks)
+            return
+        for name, record in records:
+            for pat, pos in scan(chunk for _, chunk in record):
+                yield name, pat, pos
 
     def reset(self):
         """
@@ -111,7 +260,9 @@ class FiniteAutomata:
         self.sigma = set()
         self.q_0 = 0
         self.F = set()
-        self.delta = {}
+        self.alphabet = []
+        self.char_map = array('H', [0]) * self.NO_OF_CHARS
+        self._delta = None
         print("Transition function table successfully reset!")
 
     def preprocess_text(self, txt):
@@ -143,8 +294,9 @@ class FiniteAutomata:
         """
         Prints the transition function table for debugging.
         """
+        print("Columns:", self.alphabet + ["<other>"])
         for row in self.TF:
-            print(row)
+            print(row.tolist())
 
     def print_dfa(self):
         """
@@ -182,6 +334,188 @@ class FiniteAutomata:
         else:
             display(dot)
 
+class AhoCorasick:
+    """
+    Represents an Aho-Corasick automaton for multi-pattern searching.
+
+    The patterns are stored in a trie whose nodes are extended with failure links (the longest proper
+    suffix of the node's string that is also a trie node) and output links (the nearest node along the
+    failure chain that ends a pattern). Building the automaton is linear in the total pattern length and
+    all patterns are found in a single pass over the text.
+    """
+    def __init__(self):
+        """
+        Initializes an empty AhoCorasick automaton.
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.output_link = [0]
+        self.terminal = [None]
+        self.patterns = []
+
+    def build(self, patterns):
+        """
+        Builds the automaton for a list of patterns.
+
+        Args:
+            patterns (list of str): The list of pattern strings.
+
+        Raises:
+            ValueError: If the list of patterns is empty or contains an empty pattern.
+        """
+        if not patterns:
+            raise ValueError("Patterns list cannot be empty.")
+
+        self.goto = [{}]
+        self.terminal = [None]
+        self.patterns = list(dict.fromkeys(patterns))
+
+        # Insert every pattern into the trie
+        for pat in self.patterns:
+            if not pat:
+                raise ValueError("Pattern cannot be empty.")
+            state = 0
+            for char in pat:
+                if char not in self.goto[state]:
+                    self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.terminal.append(None)
+                state = self.goto[state][char]
+            self.terminal[state] = pat
+
+        # Compute failure and output links in breadth-first order
+        self.fail = [0] * len(self.goto)
+        self.output_link = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and char not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[child] = self.goto[fallback].get(char, 0)
+                suffix = self.fail[child]
+                self.output_link[child] = suffix if self.terminal[suffix] is not None else self.output_link[suffix]
+                queue.append(child)
+
+    def step(self, state, char):
+        """
+        Computes the next state of the automaton after reading a character.
+
+        Args:
+            state (int): The current state.
+            char (str): The character read.
+
+        Returns:
+            int: The next state.
+        """
+        while state and char not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(char, 0)
+
+    def matches(self, state):
+        """
+        Lists the patterns that end at a given state, following its output links.
+
+        Args:
+            state (int): The state of the automaton.
+
+        Returns:
+            list of str: The patterns recognized at the state.
+        """
+        found = []
+        if self.terminal[state] is not None:
+            found.append(self.terminal[state])
+        state = self.output_link[state]
+        while state:
+            found.append(self.terminal[state])
+            state = self.output_link[state]
+        return found
+
+    def search(self, patterns, txt, preprocessing=True):
+        """
+        Searches for multiple patterns in a provided text in a single pass.
+
+        Args:
+            patterns (list of str): The list of pattern strings.
+            txt (str): The text string to search within.
+            preprocessing (bool, optional): Whether to lowercase the text and patterns. Default is True.
+
+        Returns:
+            dict: A dictionary where keys are patterns and values are lists of starting indices
+            where the pattern was found in the text.
+        """
+        if not patterns:
+            raise ValueError("Patterns list cannot be empty.")
+
+        if not txt:
+            raise ValueError("Text string cannot be empty.")
+
+        if preprocessing:
+            txt = txt.lower()
+            patterns = [pat.lower() for pat in patterns]
+
+        self.build(patterns)
+        results = {pat: [] for pat in patterns}
+
+        state = 0
+        for i, char in enumerate(txt):
+            state = self.step(state, char)
+            if self.terminal[state] is not None or self.output_link[state]:
+                for pat in self.matches(state):
+                    results[pat].append(i - len(pat) + 1)
+
+        return results
+
+    def search_stream(self, patterns, chunks, preprocessing=True, chunk_size=1 << 20, fasta=False):
+        """
+        Searches for multiple patterns in a text given in chunks, in a single pass and keeping only one
+        chunk in memory. The state of the automaton is carried across chunk boundaries.
+
+        Args:
+            patterns (list of str): The list of pattern strings.
+            chunks (iterable of str or file object): The text, as an iterable of chunks or a text file opened for reading.
+            preprocessing (bool, optional): Whether to lowercase the text and patterns. Default is True.
+            chunk_size (int, optional): Number of characters read at a time from a file object. Default is 1 MiB.
+            fasta (bool, optional): If True, chunks is a FASTA file object read with fasta_chunks (headers and
+            line breaks skipped) and each record is searched separately. Default is False.
+
+        Yields:
+            tuple: (pattern, starting index) of each match in the whole text, in the order they end.
+            With fasta=True, (record name, pattern, starting index in the record's sequence) instead.
+        """
+        if fasta:
+            records = groupby(fasta_chunks(chunks, chunk_size), key=itemgetter(0))
+        elif hasattr(chunks, "read"):
+            read = chunks.read
+            chunks = iter(lambda: read(chunk_size), "")
+
+        if preprocessing:
+            patterns = [pat.lower() for pat in patterns]
+
+        self.build(patterns)
+
+        def scan(chunks):
+            state = 0
+            offset = 0
+            for chunk in chunks:
+                if preprocessing:
+                    chunk = chunk.lower()
+                for i, char in enumerate(chunk):
+                    state = self.step(state, char)
+                    if self.terminal[state] is not None or self.output_link[state]:
+                        for pat in self.matches(state):
+                            yield pat, offset + i - len(pat) + 1
+                offset += len(chunk)
+
+        if not fasta:
+            yield from scan(chunks)
+            return
+        for name, record in records:
+            for pat, pos in scan(chunk for _, chunk in record):
+                yield name, pat, pos
+
 class DFA:
     """
     Represents a Deterministic Finite Automaton (DFA).
@@ -194,8 +528,8 @@ class DFA:
         Args:
             states (set): Set of states in the DFA.
             alphabet (set): Alphabet of the DFA.
-            transition (dict): Transition function of the DFA.
-            initial_state (str): Initial state of the DFA.
+            transition (dict): Transition function of the DFA, as {state: {symbol: next_state}}.
+            initial_state (str or frozenset): Initial state of the DFA (a frozenset of NFA states when built by NFA.to_dfa).
             accepting_states (set): Set of accepting states in the DFA.
 
         Raises:
@@ -207,8 +541,8 @@ class DFA:
             raise ValueError("Alphabet must be a set.")
         if not isinstance(transition, dict):
             raise ValueError("Transition function must be a dictionary.")
-        if not isinstance(initial_state, str):
-            raise ValueError("Initial state must be a string.")
+        if not isinstance(initial_state, (str, frozenset)):
+            raise ValueError("Initial state must be a string or a frozenset.")
         if not isinstance(accepting_states, set):
             raise ValueError("Accepting states must be a set.")
 
@@ -217,13 +551,176 @@ class DFA:
         self.transition = transition
         self.initial_state = initial_state
         self.accepting_states = accepting_states
+        self.table = None
+
+    def compile(self):
+        """
+        Builds the integer-indexed transition table used by run and search.
+
+        States are numbered in breadth-first order from the initial state (which gets index 0) and symbols
+        are mapped to columns. Missing transitions lead to -1, an implicit dead state.
+        """
+        index = {self.initial_state: 0}
+        order = [self.initial_state]
+        for state in order:
+            for target in self.transition.get(state, {}).values():
+                if target not in index:
+                    index[target] = len(order)
+                    order.append(target)
+
+        self.symbol_index = {symbol: k for k, symbol in enumerate(sorted(self.alphabet))}
+        self.table = []
+        for state in order:
+            row = array('i', [-1]) * len(self.symbol_index)
+            for symbol, target in self.transition.get(state, {}).items():
+                if symbol in self.symbol_index:
+                    row[self.symbol_index[symbol]] = index[target]
+            self.table.append(row)
+        self.accepting = bytearray(state in self.accepting_states for state in order)
+
+    def run(self, text):
+        """
+        Runs the DFA on an input string.
+
+        Args:
+            text (str): Input string.
+
+        Returns:
+            bool: True if the input string is accepted by the DFA, False otherwise.
+        """
+        if self.table is None:
+            self.compile()
+        table, symbol_index = self.table, self.symbol_index
+        state = 0
+        for symbol in text:
+            column = symbol_index.get(symbol)
+            if column is None:
+                return False
+            state = table[state][column]
+            if state < 0:
+                return False
+        return bool(self.accepting[state])
+
+    def search(self, text, restart=False):
+        """
+        Scans a text with the DFA, reporting every position where the prefix read so far is accepted.
+        For a DFA that recognizes every string ending with a match (e.g. built from a pattern preceded by
+        any-symbol loops, as NFA.from_regex(..., unanchored=True) does), these are the end positions of the matches.
+
+        Args:
+            text (str): The text to scan.
+            restart (bool, optional): If True, a symbol outside the alphabet sends the scan back to the initial
+            state instead of stopping it. This is what an unanchored DFA needs for texts with other symbols
+            (e.g. N in a DNA sequence), since no match can span such a symbol. Default is False.
+
+        Returns:
+            list: End positions (exclusive) i such that text[:i] is accepted.
+        """
+        if self.table is None:
+            self.compile()
+        table, symbol_index, accepting = self.table, self.symbol_index, self.accepting
+        ends = [0] if accepting[0] else []
+        state = 0
+        for i, symbol in enumerate(text):
+            column = symbol_index.get(symbol)
+            if column is None:
+                if not restart:
+                    break
+                state = 0
+                continue
+            state = table[state][column]
+            if state < 0:
+                break
+            if accepting[state]:
+                ends.append(i + 1)
+        return ends
+
+    def minimize(self):
+        """
+        Minimizes the DFA with Hopcroft's partition refinement algorithm.
+
+        Unreachable states are dropped and equivalent states are merged. Starting from the partition
+        {accepting, non-accepting}, each block taken from the worklist splits the blocks whose states
+        disagree on whether they move into it, and only the smaller half of a split block is queued.
+
+        Returns:
+            DFA: The minimal DFA, with states named "q0" (initial), "q1", ...
+        """
+        self.compile()
+        n = len(self.table)
+        symbols = len(self.symbol_index)
+
+        # Complete the DFA with an explicit dead state if some transition is missing
+        dead = n if any(target < 0 for row in self.table for target in row) else None
+        size = n + (dead is not None)
+        targets = [[dead if target < 0 else target for target in row] for row in self.table]
+        if dead is not None:
+            targets.append([dead] * symbols)
+
+        # Inverse transitions: predecessors[c][q] lists the states that move to q on symbol c
+        predecessors = [[[] for _ in range(size)] for _ in range(symbols)]
+        for q in range(size):
+            for c in range(symbols):
+                predecessors[c][targets[q][c]].append(q)
+
+        accepting = {q for q in range(n) if self.accepting[q]}
+        partition = [block for block in (set(accepting), set(range(size)) - accepting) if block]
+        block_of = [0] * size
+        for b, block in enumerate(partition):
+            for q in block:
+                block_of[q] = b
+        worklist = set(range(len(partition)))
+
+        while worklist:
+            splitter = set(partition[worklist.pop()])
+            for c in range(symbols):
+                moving = {p for q in splitter for p in predecessors[c][q]}
+                touched = {}
+                for p in moving:
+                    touched.setdefault(block_of[p], set()).add(p)
+                for b, inside in touched.items():
+                    if len(inside) == len(partition[b]):
+                        continue
+                    partition[b] -= inside
+                    new = len(partition)
+                    partition.append(inside)
+                    for q in inside:
+                        block_of[q] = new
+                    if b in worklist or len(inside) <= len(partition[b]):
+                        worklist.add(new)
+                    else:
+                        worklist.add(b)
+
+        # Name the blocks in breadth-first order from the initial state
+        names = {block_of[0]: "q0"}
+        order = [block_of[0]]
+        transition = {}
+        for b in order:
+            q = next(iter(partition[b]))
+            transition[names[b]] = {}
+            for symbol, c in self.symbol_index.items():
+                target = block_of[targets[q][c]]
+                if target not in names:
+                    names[target] = f"q{len(order)}"
+                    order.append(target)
+                transition[names[b]][symbol] = names[target]
+
+        states = set(transition)
+        accepting_states = {names[b] for b in order if next(iter(partition[b])) in accepting}
+        return DFA(states, set(self.alphabet), transition, "q0", accepting_states)
 
 class NFA:
     """
     Represents a Non-Deterministic Finite Automaton (NFA).
     """
-    
-    def __init__(self, states, alphabet, transition, initial_state, accepting_states):
+
+    IUPAC_CODES = {
+        "A": "A", "C": "C", "G": "G", "T": "T", "U": "T",
+        "R": "AG", "Y": "CT", "S": "CG", "W": "AT", "K": "GT", "M": "AC",
+        "B": "CGT", "D": "AGT", "H": "ACT", "V": "ACG", "N": "ACGT"
+    }
+
+    def __init__(self, states, alphabet, transition, initial_state, accepting_states, cache_capacity=1024):
         """
         Initializes the NFA.
 
@@ -233,7 +730,11 @@ class NFA:
             transition (dict): Transition function of the NFA.
             initial_state (str): Initial state of the NFA.
             accepting_states (set): Set of accepting states in the NFA.
+            cache_capacity (int, optional): Maximum number of DFA states kept by the lazy subset construction
+            used in simulate. Least recently used states are evicted beyond it. Default is 1024.
         """
+        if cache_capacity < 1:
+            raise ValueError("Cache capacity must be a positive integer.")
         if not isinstance(states, set):
             raise ValueError("States must be a set.")
         if not isinstance(alphabet, set):
@@ -250,10 +751,39 @@ class NFA:
         self.transition = transition
         self.initial_state = initial_state
         self.accepting_states = accepting_states
+        self.cache_capacity = cache_capacity
+        self.closures = {}
+        self.dfa_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def state_closure(self, state):
+        """
+        Computes the epsilon closure of a single state, caching it.
+
+        Args:
+            state (str): A state of the NFA.
+
+        Returns:
+            frozenset: Epsilon closure of the state.
+        """
+        closure = self.closures.get(state)
+        if closure is None:
+            closure = {state}
+            stack = [state]
+            while stack:
+                current = stack.pop()
+                if current in self.transition and '' in self.transition[current]:
+                    for epsilon_state in self.transition[current]['']:
+                        if epsilon_state not in closure:
+                            closure.add(epsilon_state)
+                            stack.append(epsilon_state)
+            closure = self.closures[state] = frozenset(closure)
+        return closure
 
     def epsilon_closure(self, states):
         """
-        Computes the epsilon closure of a set of states.
+        Computes the epsilon closure of a set of states, as the union of the cached closures of each state.
 
         Args:
             states (set): Set of states.
@@ -261,16 +791,10 @@ class NFA:
         Returns:
             set: Epsilon closure of the input set of states.
         """
-        closure = set(states)
-        stack = list(states)
-        while stack:
-            state = stack.pop()
-            if state in self.transition and '' in self.transition[state]:
-                epsilon_states = self.transition[state]['']
-                for epsilon_state in epsilon_states:
-                    if epsilon_state not in closure:
-                        closure.add(epsilon_state)
-                        stack.append(epsilon_state)
+        closure = set()
+        for state in states:
+            if state not in closure:
+                closure |= self.state_closure(state)
         return closure
 
     def move(self, states, symbol):
@@ -294,16 +818,75 @@ class NFA:
         """
         Simulates the NFA on an input string.
 
+        The subset construction is done lazily: each set of NFA states reached is cached as a DFA state,
+        together with its acceptance and the outgoing transitions computed so far, so revisiting a state
+        and symbol costs one dict lookup. At most cache_capacity DFA states are kept (LRU eviction);
+        an evicted state is simply rebuilt if it is reached again.
+
         Args:
             input_string (str): Input string.
 
         Returns:
             bool: True if the input string is accepted by the NFA, False otherwise.
         """
-        current_states = self.epsilon_closure({self.initial_state})
+        cache = self.dfa_cache
+        current = self.state_closure(self.initial_state)
+        entry = self.lazy_state(current)
         for symbol in input_string:
-            current_states = self.epsilon_closure(self.move(current_states, symbol))
-        return any(state in self.accepting_states for state in current_states)
+            target = entry[1].get(symbol)
+            if target is None:
+                target = entry[1][symbol] = frozenset(self.epsilon_closure(self.move(current, symbol)))
+            current = target
+            entry = cache.get(current)
+            if entry is None:
+                entry = self.lazy_state(current)
+            else:
+                cache.move_to_end(current)
+                self.cache_hits += 1
+            if not current:
+                return False
+        return entry[0]
+
+    def lazy_state(self, states):
+        """
+        Adds a set of NFA states to the lazy DFA cache, evicting the least recently used state if it is full.
+
+        Args:
+            states (frozenset): Epsilon-closed set of NFA states.
+
+        Returns:
+            list: [accepting, transitions], where transitions maps symbols to the next set of states.
+        """
+        entry = self.dfa_cache.get(states)
+        if entry is not None:
+            self.dfa_cache.move_to_end(states)
+            self.cache_hits += 1
+            return entry
+        self.cache_misses += 1
+        entry = [not self.accepting_states.isdisjoint(states), {}]
+        self.dfa_cache[states] = entry
+        if len(self.dfa_cache) > self.cache_capacity:
+            self.dfa_cache.popitem(last=False)
+        return entry
+
+    def cache_info(self):
+        """
+        Returns the statistics of the lazy DFA cache.
+
+        Returns:
+            dict: Number of hits, misses, cached DFA states and the cache capacity.
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses,
+                "size": len(self.dfa_cache), "capacity": self.cache_capacity}
+
+    def clear_cache(self):
+        """
+        Removes the cached epsilon closures and DFA states. Must be called after changing the transitions.
+        """
+        self.closures.clear()
+        self.dfa_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def visualize_nfa_transitions(self, filename=None):
         """
@@ -346,20 +929,18 @@ class NFA:
 
         # Queue for processing states
         queue = deque([dfa_initial_state])
-        processed_states = set()  # Set to keep track of processed states
+        processed_states = {dfa_initial_state}  # Set to keep track of queued or processed states
 
         while queue:
             current_dfa_state = queue.popleft()
             dfa_states.add(current_dfa_state)
-            processed_states.add(current_dfa_state)
 
             for symbol in self.alphabet:
-                next_nfa_states = set()
-                for nfa_state in current_dfa_state:
-                    next_nfa_states |= self.move(nfa_state, symbol)
+                next_nfa_states = self.move(current_dfa_state, symbol)
                 next_dfa_state = frozenset(self.epsilon_closure(next_nfa_states))
 
-                if next_dfa_state not in dfa_states:
+                if next_dfa_state not in processed_states:
+                    processed_states.add(next_dfa_state)
                     queue.append(next_dfa_state)
 
                 if current_dfa_state not in dfa_transition:
@@ -371,4 +952,160 @@ class NFA:
             if any(nfa_state in self.accepting_states for nfa_state in state):
                 dfa_accepting_states.add(state)
 
-        return DFA(dfa_states, self.alphabet, dfa_transition, dfa_initial_state, dfa_accepting_states)
\ No newline at end of file
+        return DFA(dfa_states, self.alphabet, dfa_transition, dfa_initial_state, dfa_accepting_states)
+
+    @classmethod
+    def from_regex(cls, pattern, alphabet=None, iupac=False, unanchored=False):
+        """
+        Compiles a regular expression into an NFA using Thompson's construction.
+
+        Supported syntax: literal symbols, concatenation, alternation (|), grouping with parentheses,
+        the repetition operators *, + and ?, the wildcard ., symbol classes such as [AT] or negated [^GC],
+        and \\ to escape an operator. With iupac=True every IUPAC nucleotide code (R, Y, N, ...) stands for
+        its class of bases, so "TATAWAW" is equivalent to "TATA[AT]A[AT]".
+
+        Args:
+            pattern (str): The regular expression.
+            alphabet (set, optional): Alphabet of the NFA, used by . and negated classes. Defaults to the
+            four DNA bases with iupac=True, otherwise to the symbols used in the pattern.
+            iupac (bool, optional): Whether to expand IUPAC nucleotide codes. Default is False.
+            unanchored (bool, optional): If True, the initial state loops on every symbol, so the NFA accepts
+            every prefix of a text that ends with a match (suited to DFA.search). Default is False.
+
+        Returns:
+            NFA: The NFA recognizing the pattern.
+
+        Raises:
+            ValueError: If the pattern is malformed.
+        """
+        edges = []  # (source, symbols, target), symbols is a set, None for the wildcard or ("^", set)
+        epsilons = []
+        count = [0]
+        pos = [0]
+
+        def new_state():
+            count[0] += 1
+            return f"s{count[0] - 1}"
+
+        def peek():
+            return pattern[pos[0]] if pos[0] < len(pattern) else None
+
+        def symbols_of(char):
+            if iupac and char.upper() in cls.IUPAC_CODES:
+                return set(cls.IUPAC_CODES[char.upper()])
+            return {char}
+
+        def fragment(symbols):
+            start, end = new_state(), new_state()
+            edges.append((start, symbols, end))
+            return start, end
+
+        def parse_class():
+            negated = peek() == "^"
+            if negated:
+                pos[0] += 1
+            symbols = set()
+            while peek() != "]":
+                if peek() is None:
+                    raise ValueError("Unterminated symbol class.")
+                if peek() == "\\":
+                    pos[0] += 1
+                    if peek() is None:
+                        raise ValueError("Dangling escape at the end of the pattern.")
+                symbols |= symbols_of(peek())
+                pos[0] += 1
+            pos[0] += 1
+            if not symbols:
+                raise ValueError("Empty symbol class.")
+            return ("^", symbols) if negated else symbols
+
+        def parse_atom():
+            char = peek()
+            pos[0] += 1
+            if char == "(":
+                start, end = parse_alternation()
+                if peek() != ")":
+                    raise ValueError("Missing closing parenthesis.")
+                pos[0] += 1
+                return start, end
+            if char == "[":
+                return fragment(parse_class())
+            if char == ".":
+                return fragment(None)
+            if char == "\\":
+                if peek() is None:
+                    raise ValueError("Dangling escape at the end of the pattern.")
+                pos[0] += 1
+                return fragment(symbols_of(pattern[pos[0] - 1]))
+            if char in "*+?":
+                raise ValueError(f"Nothing to repeat at position {pos[0] - 1}.")
+            return fragment(symbols_of(char))
+
+        def parse_repetition():
+            start, end = parse_atom()
+            while peek() is not None and peek() in "*+?":
+                operator = peek()
+                pos[0] += 1
+                new_start, new_end = new_state(), new_state()
+                epsilons.append((new_start, start))
+                epsilons.append((end, new_end))
+                if operator in "*?":
+                    epsilons.append((new_start, new_end))
+                if operator in "*+":
+                    epsilons.append((end, start))
+                start, end = new_start, new_end
+            return start, end
+
+        def parse_concatenation():
+            start = end = new_state()
+            while peek() is not None and peek() not in "|)":
+                atom_start, atom_end = parse_repetition()
+                epsilons.append((end, atom_start))
+                end = atom_end
+            return start, end
+
+        def parse_alternation():
+            start, end = parse_concatenation()
+            if peek() != "|":
+                return start, end
+            new_start, new_end = new_state(), new_state()
+            epsilons.append((new_start, start))
+            epsilons.append((end, new_end))
+            while peek() == "|":
+                pos[0] += 1
+                start, end = parse_concatenation()
+                epsilons.append((new_start, start))
+                epsilons.append((end, new_end))
+            return new_start, new_end
+
+        start, end = parse_alternation()
+        if pos[0] < len(pattern):
+            raise ValueError(f"Unbalanced parenthesis at position {pos[0]}.")
+
+        if alphabet is None:
+            alphabet = set("ACGT") if iupac else set()
+            for _, symbols, _ in edges:
+                if symbols is not None:
+                    alphabet |= symbols[1] if isinstance(symbols, tuple) else symbols
+        alphabet = set(alphabet)
+
+        transition = {}
+        for source, symbols, target in edges:
+            if symbols is None:
+                symbols = alphabet
+            elif isinstance(symbols, tuple):
+                symbols = alphabet - symbols[1]
+            for symbol in symbols:
+                transition.setdefault(source, {}).setdefault(symbol, set()).add(target)
+        for source, target in epsilons:
+            transition.setdefault(source, {}).setdefault("", set()).add(target)
+
+        if unanchored:
+            initial = new_state()
+            for symbol in alphabet:
+                transition.setdefault(initial, {}).setdefault(symbol, set()).add(initial)
+            transition[initial][""] = {start}
+            start = initial
+
+        states = {f"s{i}" for i in range(count[0])}
+        return cls(states, alphabet, transition, start, {end})
\ No newline at end of file
@@ -1,3 +1,6 @@
+from itertools import groupby
+from operator import itemgetter
+
 ## Naive Algorithm
 def naive(seq, pattern):
     """
@@ -82,6 +85,76 @@ def KMP(seq, pattern):
 
 
 ## Rabin-Karp Algorithm
+RK_BASE = 257                   # Base of the polynomial hash (larger than any byte value)
+RK_MODULUS = 8388593           # Largest prime below 2^23: keeps the hash arithmetic on small integers
+
+
+def rabin_karp_scan(seq, m, targets):
+    """
+    Scans a sequence with a polynomial rolling hash over windows of length m.
+    The hash of the next window is obtained from the previous one in O(1): the first character is removed,
+    the rest is shifted by the base and the new character is added. Latin-1 sequences are scanned as bytes,
+    so the character codes come straight from the iteration; other sequences are mapped with ord.
+
+    Args:
+        seq (str): The sequence to scan.
+        m (int): The window (pattern) length.
+        targets (dict): Maps the hash of each pattern to the list of patterns with that hash.
+
+    Returns:
+        dict: A dictionary with each pattern as key and the list of its starting indices as value.
+    """
+    matches = {pattern: [] for patterns in targets.values() for pattern in patterns}
+    n = len(seq)
+    if m > n:
+        return matches
+    if m == 0:
+        for pattern in matches:
+            matches[pattern] = list(range(n + 1))
+        return matches
+
+    try:
+        codes = seq.encode("latin-1")
+        leaving_codes, entering_codes = codes, codes[m:]
+    except UnicodeEncodeError:
+        leaving_codes, entering_codes = map(ord, seq), map(ord, seq[m:])
+
+    high = pow(RK_BASE, m, RK_MODULUS)      # Weight of the character leaving the window, after the shift
+    window_hash = rk_hash(seq[:m])
+
+    def check(i):
+        # Hash values match: compare the characters to rule out a collision
+        window = seq[i:i + m]
+        for pattern in targets[window_hash]:
+            if window == pattern:
+                matches[pattern].append(i)
+
+    if window_hash in targets:
+        check(0)
+    # Update the rolling hash with each pair of leaving and entering characters
+    for i, (leaving, entering) in enumerate(zip(leaving_codes, entering_codes), 1):
+        window_hash = (window_hash * RK_BASE - leaving * high + entering) % RK_MODULUS
+        if window_hash in targets:
+            check(i)
+    return matches
+
+
+def rk_hash(pattern):
+    """
+    Computes the polynomial hash used by rabin_karp_scan.
+
+    Args:
+        pattern (str): The pattern to hash.
+
+    Returns:
+        int: The hash value of the pattern.
+    """
+    h = 0
+    for char in pattern:
+        h = (h * RK_BASE + ord(char)) % RK_MODULUS
+    return h
+
+
 def rabin_karp(seq, pattern):
     """
     Rabin-Karp string matching algorithm to find all occurrences of a pattern in a given sequence.
@@ -93,32 +166,118 @@ def rabin_karp(seq, pattern):
     Returns:
         list: A list of starting indices where the pattern is found in the sequence.
     """
-    n = len(seq)        # Length of the sequence
-    m = len(pattern)    # Length of the pattern
-    matches = []        # List to store the starting indices of matches
+    return rabin_karp_scan(seq, len(pattern), {rk_hash(pattern): [pattern]})[pattern]
 
-    # Calculate hash value for the pattern and the first window of the sequence
-    pattern_hash = hash(pattern)
-    window_hash = hash(seq[:m])
 
-    # Iterate over each possible starting position in the sequence
-    for i in range(n - m + 1):
-        # Check if hash values match and compare characters if they do
-        if pattern_hash == window_hash and seq[i:i + m] == pattern:
-            matches.append(i)
-        
-        # Update rolling hash for the next window if not at the end of the sequence
-        if i < n - m:
-            window_hash = hash(seq[i + 1:i + m + 1])
+def rabin_karp_multi(seq, patterns):
+    """
+    Multi-pattern Rabin-Karp: each window hash is looked up in the set of pattern hashes, so a panel of
+    k-mers is screened in a single pass over the sequence per distinct pattern length.
+
+    Args:
+        seq (str): The sequence in which to search for the patterns.
+        patterns (iterable of str): The patterns to search for.
+
+    Returns:
+        dict: A dictionary with each pattern as key and the list of its starting indices as value.
+    """
+    by_length = {}
+    for pattern in patterns:
+        targets = by_length.setdefault(len(pattern), {})
+        candidates = targets.setdefault(rk_hash(pattern), [])
+        if pattern not in candidates:
+            candidates.append(pattern)
+
+    matches = {}
+    for m, targets in by_length.items():
+        matches.update(rabin_karp_scan(seq, m, targets))
     return matches
 
 
 
 ## Boyer-Moore Algorithm
+NO_OF_CHARS = 256               # Size of the array-indexed bad character tables
+
+
+def encode_pair(seq, pattern):
+    """
+    Encodes the sequence and the pattern as bytes when every character fits in one byte, so characters can be
+    used directly as indices into tables of NO_OF_CHARS entries and windows compared at C speed.
+
+    Returns:
+        tuple: (seq, pattern) as bytes, or None if any character is outside Latin-1.
+    """
+    try:
+        return seq.encode("latin-1"), pattern.encode("latin-1")
+    except UnicodeEncodeError:
+        return None
+
+
+def bad_char_table(pattern):
+    """
+    Preprocessing function for the Bad Character Heuristic.
+    Constructs an array indexed by character code with the last occurrence index of each character in the
+    pattern, or -1 for characters not in the pattern.
+
+    Args:
+        pattern (bytes): The pattern to preprocess.
+
+    Returns:
+        list: The last occurrence index of each of the NO_OF_CHARS characters.
+    """
+    bad_char = [-1] * NO_OF_CHARS
+    for i, code in enumerate(pattern):
+        bad_char[code] = i
+    return bad_char
+
+
+def good_suffix_table(pattern):
+    """
+    Preprocessing function for the (strong) Good Suffix Heuristic.
+    shift[j] is the shift to apply when pattern[j:] matched and pattern[j - 1] mismatched; shift[0] is the
+    shift after a full match. It combines the case where the matched suffix occurs again in the pattern,
+    preceded by a different character, with the case where only a suffix of it is a prefix of the pattern.
+    Source: Modification of code provided by https://www.geeksforgeeks.org/boyer-moore-algorithm-good-suffix-heuristic/
+
+    Args:
+        pattern (str or bytes): The pattern to preprocess.
+
+    Returns:
+        list: The good suffix shifts, of length len(pattern) + 1.
+    """
+    m = len(pattern)
+    shift = [0] * (m + 1)
+    border = [0] * (m + 1)      # border[i] is the start of the widest border of pattern[i:]
+
+    # Case 1: the matched suffix occurs somewhere else in the pattern
+    i = m
+    j = m + 1
+    border[i] = j
+    while i > 0:
+        while j <= m and pattern[i - 1] != pattern[j - 1]:
+            if shift[j] == 0:
+                shift[j] = j - i
+            j = border[j]
+        i -= 1
+        j -= 1
+        border[i] = j
+
+    # Case 2: only a part of the matched suffix is a prefix of the pattern
+    j = border[0]
+    for i in range(m + 1):
+        if shift[i] == 0:
+            shift[i] = j
+        if i == j:
+            j = border[j]
+    return shift
+
+
 def boyer_moore(seq, pattern):
     """
     Boyer-Moore string matching algorithm to find all occurrences of a pattern in a given sequence.
-    This implementation uses the Bad Character Heuristic.
+    Each shift is the largest one given by the Bad Character and the Good Suffix heuristics; the good suffix
+    rule is what keeps the shifts long on low-entropy sequences such as DNA, where the bad character rule
+    alone often shifts by one.
     Source: Modification of code provided by https://www.geeksforgeeks.org/boyer-moore-algorithm-for-pattern-searching/
 
     Args:
@@ -128,40 +287,333 @@ def boyer_moore(seq, pattern):
     Returns:
         list: A list of starting indices where the pattern is found in the sequence.
     """
-    def badCharHeuristic(pattern):
-        """
-        Preprocessing function for the Bad Character Heuristic.
-        Constructs a dictionary that maps each character in the pattern to its last occurrence index.
-        
-        Args:
-            pattern (str): The pattern to preprocess.
-        
-        Returns:
-            dict: A dictionary with characters as keys and their last occurrence index in the pattern as values.
-        """
-        badChar = {}
-        for i, char in enumerate(pattern):
-            badChar[char] = i
-        return badChar
-
     m = len(pattern)                        # Length of the pattern
     n = len(seq)                            # Length of the sequence
-    badChar = badCharHeuristic(pattern)     # Preprocess the pattern to get the bad character heuristic table
+    if m == 0:
+        return list(range(n + 1))
+
+    encoded = encode_pair(seq, pattern)
+    if encoded is not None:
+        seq, pattern = encoded
+        bad_char = bad_char_table(pattern).__getitem__
+    else:
+        last = {char: i for i, char in enumerate(pattern)}
+        bad_char = lambda char: last.get(char, -1)
+    good_suffix = good_suffix_table(pattern)
     shift = 0                               # Shift of the pattern with respect to the sequence
     occurrences = []                        # List to store the starting indices of matches
 
     while shift <= n - m:
         j = m - 1                           # Start from the end of the pattern
-        
+
         # Move backwards through the pattern as long as characters are matching
         while j >= 0 and pattern[j] == seq[shift + j]:
             j -= 1
-        
+
         # If the pattern is found, add the shift index to the occurrences list
         if j == -1:
             occurrences.append(shift)
-            shift += m - badChar.get(seq[shift + m], -1) if shift + m < n else 1
+            shift += good_suffix[0]
         else:
-            # Calculate the shift based on the bad character heuristic
-            shift += max(1, j - badChar.get(seq[shift + j], -1))
-    return occurrences
\ No newline at end of file
+            # Calculate the shift based on both heuristics
+            shift += max(good_suffix[j + 1], j - bad_char(seq[shift + j]))
+    return occurrences
+
+
+## Horspool Algorithm
+def horspool(seq, pattern):
+    """
+    Boyer-Moore-Horspool string matching algorithm to find all occurrences of a pattern in a given sequence.
+    After each attempt the pattern is shifted according to the last character of the current window only,
+    which makes the shift table simpler than Boyer-Moore's while keeping long shifts on large alphabets.
+
+    Args:
+        seq (str): The sequence in which to search for the pattern.
+        pattern (str): The pattern to search for within the sequence.
+
+    Returns:
+        list: A list of starting indices where the pattern is found in the sequence.
+    """
+    m = len(pattern)
+    n = len(seq)
+    if m == 0:
+        return list(range(n + 1))
+
+    encoded = encode_pair(seq, pattern)
+    if encoded is not None:
+        seq, pattern = encoded
+        shifts = [m] * NO_OF_CHARS
+    else:
+        shifts = {}
+    # Distance from the last occurrence of each character (excluding the last one) to the end of the pattern
+    for i in range(m - 1):
+        shifts[pattern[i]] = m - 1 - i
+    shift_of = shifts.__getitem__ if encoded is not None else (lambda char: shifts.get(char, m))
+
+    occurrences = []
+    shift = 0
+    while shift <= n - m:
+        last = seq[shift + m - 1]
+        if last == pattern[-1] and seq[shift:shift + m] == pattern:
+            occurrences.append(shift)
+        shift += shift_of(last)
+    return occurrences
+
+
+## Sunday Algorithm
+def sunday(seq, pattern):
+    """
+    Sunday (Quick Search) string matching algorithm to find all occurrences of a pattern in a given sequence.
+    The shift is given by the character just after the current window, so it can be up to len(pattern) + 1.
+
+    Args:
+        seq (str): The sequence in which to search for the pattern.
+        pattern (str): The pattern to search for within the sequence.
+
+    Returns:
+        list: A list of starting indices where the pattern is found in the sequence.
+    """
+    m = len(pattern)
+    n = len(seq)
+    if m == 0:
+        return list(range(n + 1))
+
+    encoded = encode_pair(seq, pattern)
+    if encoded is not None:
+        seq, pattern = encoded
+        shifts = [m + 1] * NO_OF_CHARS
+    else:
+        shifts = {}
+    # Distance from the last occurrence of each character to the position just after the pattern
+    for i in range(m):
+        shifts[pattern[i]] = m - i
+    shift_of = shifts.__getitem__ if encoded is not None else (lambda char: shifts.get(char, m + 1))
+
+    occurrences = []
+    shift = 0
+    while shift <= n - m:
+        if seq[shift:shift + m] == pattern:
+            occurrences.append(shift)
+        if shift + m >= n:
+            break
+        shift += shift_of(seq[shift + m])
+    return occurrences
+
+
+## Shift-And Algorithm
+def shift_and(seq, pattern):
+    """
+    Bit-parallel Shift-And string matching algorithm to find all occurrences of a pattern in a given sequence.
+    Bit j of the state is set when pattern[:j + 1] matches the text ending at the current character, so each
+    character of the sequence is processed with one shift, one OR and one AND over the whole pattern at once.
+    Python integers are used as bit vectors, so there is no limit on the pattern length.
+    (Shift-Or is the same algorithm over the complemented masks; it saves the OR 1 in hardware, not in Python.)
+
+    Args:
+        seq (str): The sequence in which to search for the pattern.
+        pattern (str): The pattern to search for within the sequence.
+
+    Returns:
+        list: A list of starting indices where the pattern is found in the sequence.
+    """
+    m = len(pattern)
+    if m == 0:
+        return list(range(len(seq) + 1))
+
+    # Bit mask of the positions of each character in the pattern
+    masks = {}
+    for j, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << j)
+    accept = 1 << (m - 1)
+
+    state = 0
+    matches = []
+    get = masks.get
+    for i, char in enumerate(seq):
+        state = ((state << 1) | 1) & get(char, 0)
+        if state & accept:
+            matches.append(i - m + 1)
+    return matches
+
+
+## Wu-Manber Algorithm (approximate Shift-And)
+def wu_manber(seq, pattern, k):
+    """
+    Bit-parallel approximate string matching (Wu-Manber) to find all the substrings of a sequence within
+    edit distance k (substitutions, insertions and deletions) of a pattern.
+    It keeps one Shift-And state per number of errors d = 0..k; state d has bit j set when pattern[:j + 1]
+    matches a substring ending at the current character with at most d errors.
+
+    Args:
+        seq (str): The sequence in which to search for the pattern.
+        pattern (str): The pattern to search for within the sequence.
+        k (int): The maximum number of errors allowed.
+
+    Returns:
+        list: A list of (end, errors) tuples, where end is the index after the last character of a matching
+        substring and errors is the smallest number of errors of a match ending there.
+    """
+    if k < 0:
+        raise ValueError("The number of errors must be non-negative.")
+    m = len(pattern)
+    if m == 0:
+        return [(i, 0) for i in range(len(seq) + 1)]
+
+    masks = {}
+    for j, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << j)
+    accept = 1 << (m - 1)
+    full = (1 << m) - 1
+
+    # With d errors the first d characters of the pattern can be deleted before the text starts
+    states = [((1 << d) - 1) & full for d in range(k + 1)]
+    matches = [(0, m)] if k >= m else []  # The empty substring is within m errors of the pattern
+    get = masks.get
+    for i, char in enumerate(seq):
+        mask = get(char, 0)
+        previous = states[0]
+        new = ((previous << 1) | 1) & mask
+        states[0] = new
+        errors = 0 if new & accept else -1
+        for d in range(1, k + 1):
+            current = states[d]
+            # match, insertion (previous), substitution (previous << 1) and deletion (new << 1)
+            new = (((current << 1) | 1) & mask) | previous | ((previous | new) << 1) | 1
+            new &= full
+            previous = current
+            states[d] = new
+            if errors < 0 and new & accept:
+                errors = d
+        if errors >= 0:
+            matches.append((i + 1, errors))
+    return matches
+
+
+## Algorithm selection
+def select_algorithm(pattern, alphabet_size=None):
+    """
+    Picks the fastest exact matcher in this module for a pattern, from its length and the alphabet size.
+    On large or DNA-like alphabets Horspool's long shifts win at every length. On low-entropy alphabets
+    (two symbols or fewer) shifts are short, so the bit-parallel Shift-And is best for short patterns and the
+    good suffix rule of Boyer-Moore for longer ones.
+
+    Args:
+        pattern (str): The pattern to search for.
+        alphabet_size (int, optional): Number of distinct symbols in the sequence. Defaults to the number
+        of distinct symbols in the pattern, a rough estimate when the sequence is not known.
+
+    Returns:
+        function: One of the matchers of this module.
+    """
+    if alphabet_size is None:
+        alphabet_size = len(set(pattern))
+    if alphabet_size > 2:
+        return horspool
+    return shift_and if len(pattern) < 12 else boyer_moore
+
+
+def auto_search(seq, pattern, alphabet_size=None):
+    """
+    Finds all occurrences of a pattern in a given sequence with the matcher chosen by select_algorithm.
+
+    Args:
+        seq (str): The sequence in which to search for the pattern.
+        pattern (str): The pattern to search for within the sequence.
+        alphabet_size (int, optional): Number of distinct symbols in the sequence, see select_algorithm.
+        Defaults to len(set(seq)), which costs about 20 ms per million characters.
+
+    Returns:
+        list: A list of starting indices where the pattern is found in the sequence.
+    """
+    if alphabet_size is None:
+        alphabet_size = len(set(seq))
+    return select_algorithm(pattern, alphabet_size)(seq, pattern)
+
+
+## Streaming search
+def fasta_chunks(handle, chunk_size=1 << 20):
+    """
+    Reads the sequences of a FASTA file in chunks of about chunk_size characters, without loading whole records.
+    Header ('>') and comment (';') lines are skipped and line breaks are removed, so the chunks of each record
+    concatenate to its sequence and positions in them are sequence coordinates. Sequence lines are read with
+    a size limit, so files with very long (unwrapped) lines are also streamed.
+
+    Args:
+        handle (file object): A FASTA file opened for reading in text mode.
+        chunk_size (int, optional): Approximate number of sequence characters per chunk. Default is 1 MiB.
+
+    Yields:
+        tuple: (record name, chunk), where the record name is the first word of its header (None for a
+        sequence without a header). Records are told apart by name, so names should be unique.
+    """
+    readline = handle.readline
+    name = None
+    buffer = []
+    size = 0
+    header = False
+    line_start = True
+    for piece in iter(lambda: readline(chunk_size), ""):
+        if line_start:
+            header = piece.startswith((">", ";"))
+            if piece.startswith(">"):
+                if buffer:
+                    yield name, "".join(buffer)
+                    buffer, size = [], 0
+                if not piece.endswith("\n"):
+                    piece += readline()     # Headers are short, read the rest of the line
+                words = piece[1:].split(None, 1)
+                name = words[0] if words else ""
+        line_start = piece.endswith("\n")
+        if header:
+            continue
+        piece = piece.strip()
+        if piece:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield name, "".join(buffer)
+                buffer, size = [], 0
+    if buffer:
+        yield name, "".join(buffer)
+
+
+def stream_search(chunks, pattern, matcher=KMP, chunk_size=1 << 20, fasta=False):
+    """
+    Searches for a pattern in a text given in chunks, keeping only one chunk in memory.
+    Any of the matchers in this module can be used: the last len(pattern) - 1 characters of each chunk are
+    carried over and prepended to the next one, so matches that span a chunk boundary are found exactly once.
+
+    Args:
+        chunks (iterable of str or file object): The sequence, as an iterable of chunks or a text file opened for reading.
+        pattern (str): The pattern to search for.
+        matcher (function, optional): Matcher used on each chunk (naive, KMP, rabin_karp, boyer_moore...). Default is KMP.
+        chunk_size (int, optional): Number of characters read at a time from a file object. Default is 1 MiB.
+        fasta (bool, optional): If True, chunks is a FASTA file object read with fasta_chunks, and each
+        record is searched separately. Default is False.
+
+    Yields:
+        int: Starting index of each match in the whole sequence, in increasing order.
+        With fasta=True, (record name, starting index in the record's sequence) tuples instead.
+    """
+    if fasta:
+        for name, record in groupby(fasta_chunks(chunks, chunk_size), key=itemgetter(0)):
+            for i in stream_search((chunk for _, chunk in record), pattern, matcher):
+                yield name, i
+        return
+
+    if not pattern:
+        return
+
+    if hasattr(chunks, "read"):
+        read = chunks.read
+        chunks = iter(lambda: read(chunk_size), "")
+
+    overlap = ""                            # Tail of the previous chunks that may start a match
+    offset = 0                              # Position of the first character of overlap in the whole sequence
+    for chunk in chunks:
+        window = overlap + chunk
+        for i in matcher(window, pattern):
+            yield offset + i
+        keep = min(len(pattern) - 1, len(window))
+        overlap = window[len(window) - keep:] if keep else ""
+        offset += len(window) - keep
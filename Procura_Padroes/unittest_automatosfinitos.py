@@ -1,5 +1,9 @@
+import io
+import itertools
+import random
+import re
 import unittest
-from automatosfinitos import FiniteAutomata, NFA
+from automatosfinitos import FiniteAutomata, NFA, DFA, AhoCorasick
 
 class TestFiniteAutomata(unittest.TestCase):
     def setUp(self):
@@ -74,10 +78,227 @@ class TestFiniteAutomata(unittest.TestCase):
         self.assertEqual(self.fa.F, set())
         self.assertEqual(self.fa.delta, {})
 
+    def test_compressed_transition_table(self):
+        self.fa.compute_transition_func("acgtacg")
+        self.assertEqual(self.fa.alphabet, ["a", "c", "g", "t"])
+        self.assertTrue(all(len(row) == 5 for row in self.fa.TF))
+        self.assertEqual(self.fa.TF[7][self.fa.char_map[ord("t")]], 4)
+        self.assertEqual(self.fa.delta[(3, "t")], 4)
+        self.assertNotIn((3, "x"), self.fa.delta)
+        self.assertEqual(self.fa.search(["acgtacg"], "acgtacgtacgxacgtacg"), {"acgtacg": [0, 4, 12]})
+
+    def test_search_characters_outside_alphabet(self):
+        self.assertEqual(self.fa.search(["ab"], "ação€ ab", preprocessing=False), {"ab": [6]})
+
+    def test_compiled_pattern_cache(self):
+        fa = FiniteAutomata(cache_capacity=2)
+        patterns = ["acg", "gt"]
+        fa.search(patterns, "acgtacgt")
+        self.assertEqual(fa.cache_info(), {"hits": 0, "misses": 2, "size": 2, "capacity": 2})
+        self.assertEqual(fa.search(patterns, "ttacgt"), {"acg": [2], "gt": [4]})
+        self.assertEqual(fa.cache_info()["hits"], 2)
+        fa.search(["tt"], "acgtt")
+        self.assertEqual(fa.cache_info()["size"], 2)
+        self.assertNotIn(("acg", 256), fa.cache)
+        fa.set_alphabet_size(128)
+        fa.search(["gt"], "acgt")
+        self.assertEqual(fa.cache_info()["misses"], 4)
+
+    def test_cache_disabled(self):
+        fa = FiniteAutomata(cache_capacity=0)
+        fa.search(["abc"], "abcabc")
+        fa.search(["abc"], "abcabc")
+        self.assertEqual(fa.cache_info(), {"hits": 0, "misses": 2, "size": 0, "capacity": 0})
+
+    def test_search_stream(self):
+        txt = "abcdeabcefghijkabclmnop" * 3
+        patterns = ["abc", "lmnop", "Pab"]
+        chunks = [txt[i:i + 5] for i in range(0, len(txt), 5)]
+        found = {pat.lower(): [] for pat in patterns}
+        for pat, pos in self.fa.search_stream(patterns, chunks):
+            found[pat].append(pos)
+        self.assertEqual(found, self.fa.search(patterns, txt))
+        found = sorted(self.fa.search_stream(["ab"], io.StringIO(txt), chunk_size=4))
+        self.assertEqual([pos for _, pos in found], self.fa.search(["ab"], txt)["ab"])
+
+    def test_search_stream_fasta(self):
+        fasta = ">chr1\nACGTAC\nGTTTAC\n>chr2\nTTAC\nGT\n"
+        found = list(self.fa.search_stream(["acgtt", "acgt"], io.StringIO(fasta), chunk_size=4, fasta=True))
+        self.assertEqual(sorted(found), [("chr1", "acgt", 0), ("chr1", "acgt", 4), ("chr1", "acgtt", 4), ("chr2", "acgt", 2)])
+
     def test_preprocess_text(self):
         txt = "aBcDeAbC"
         expected = "abcdeabc"  # After lowercasing
         self.assertEqual(self.fa.preprocess_text(txt), expected)
 
+class TestAhoCorasick(unittest.TestCase):
+    def setUp(self):
+        self.ac = AhoCorasick()
+
+    def test_search_multiple_patterns(self):
+        txt = "abcdeabcefghijkabclmnop"
+        patterns = ["abc", "lmnop"]
+        expected = {"abc": [0, 5, 15], "lmnop": [18]}
+        self.assertEqual(self.ac.search(patterns, txt), expected)
+
+    def test_search_overlapping_patterns(self):
+        txt = "ushershis"
+        patterns = ["he", "she", "his", "hers", "h"]
+        expected = {"he": [2], "she": [1], "his": [6], "hers": [2], "h": [2, 6]}
+        self.assertEqual(self.ac.search(patterns, txt), expected)
+
+    def test_search_matches_finite_automata(self):
+        txt = "ACGTTGCAACGTACGTAGCTAGCTAGGATCCGATCGATCGTAGCTAGCAAAAAT"
+        patterns = ["ACG", "AGCT", "GATC", "AAAA", "T", "GGATCC"]
+        self.assertEqual(self.ac.search(patterns, txt), FiniteAutomata().search(patterns, txt))
+
+    def test_search_no_preprocessing(self):
+        txt = "aBcDeAbC"
+        patterns = ["aBc"]
+        expected = {"aBc": [0]}
+        self.assertEqual(self.ac.search(patterns, txt, preprocessing=False), expected)
+
+    def test_search_stream(self):
+        txt = "ushershis" * 4
+        patterns = ["he", "she", "his", "hers"]
+        chunks = [txt[i:i + 2] for i in range(0, len(txt), 2)]
+        found = {pat: [] for pat in patterns}
+        for pat, pos in self.ac.search_stream(patterns, chunks):
+            found[pat].append(pos)
+        self.assertEqual(found, self.ac.search(patterns, txt))
+
+    def test_search_stream_fasta(self):
+        fasta = ">chr1\nACGTAC\nGTTTAC\n>chr2\nTTAC\nGT\n"
+        found = list(self.ac.search_stream(["acgtt", "acgt"], io.StringIO(fasta), chunk_size=4, fasta=True))
+        self.assertEqual(sorted(found), [("chr1", "acgt", 0), ("chr1", "acgt", 4), ("chr1", "acgtt", 4), ("chr2", "acgt", 2)])
+
+    def test_search_empty_inputs(self):
+        with self.assertRaises(ValueError):
+            self.ac.search([], "abc")
+        with self.assertRaises(ValueError):
+            self.ac.search(["abc"], "")
+        with self.assertRaises(ValueError):
+            self.ac.search([""], "abc")
+
+class TestDFA(unittest.TestCase):
+    def setUp(self):
+        # NFA for (a|b)*abb with redundant epsilon transitions
+        self.nfa = NFA(
+            states={"q0", "q1", "q2", "q3", "q4", "q5"},
+            alphabet={"a", "b"},
+            transition={
+                "q0": {"": {"q1", "q4"}},
+                "q1": {"a": {"q1", "q2"}, "b": {"q1"}},
+                "q4": {"a": {"q4"}, "b": {"q4"}, "": {"q1"}},
+                "q2": {"b": {"q3"}},
+                "q3": {"b": {"q5"}}
+            },
+            initial_state="q0",
+            accepting_states={"q5"}
+        )
+
+    def test_to_dfa_run(self):
+        dfa = self.nfa.to_dfa()
+        for text in ["abb", "aabb", "babb", "ab", "abba", "", "bbbabb"]:
+            self.assertEqual(dfa.run(text), self.nfa.simulate(text))
+
+    def test_minimize(self):
+        dfa = self.nfa.to_dfa()
+        minimal = dfa.minimize()
+        self.assertEqual(len(minimal.states), 4)
+        self.assertEqual(minimal.initial_state, "q0")
+        for text in ["abb", "aabb", "babb", "ab", "abba", "", "bbbabb", "abbabb"]:
+            self.assertEqual(minimal.run(text), dfa.run(text))
+
+    def test_minimize_random_dfas(self):
+        random.seed(11)
+        texts = ["".join(t) for length in range(8) for t in itertools.product("ab", repeat=length)]
+        for _ in range(300):
+            n = random.randint(1, 8)
+            states = {f"s{i}" for i in range(n)}
+            transition = {}
+            for state in states:
+                for symbol in "ab":
+                    if random.random() < 0.9:
+                        transition.setdefault(state, {})[symbol] = f"s{random.randrange(n)}"
+            accepting = {state for state in states if random.random() < 0.4}
+            dfa = DFA(states, {"a", "b"}, transition, "s0", accepting)
+            minimal = dfa.minimize()
+            self.assertLessEqual(len(minimal.states), n + 1)
+            for text in texts:
+                self.assertEqual(minimal.run(text), dfa.run(text))
+
+    def test_minimize_partial_dfa(self):
+        dfa = DFA(
+            states={"s", "x", "y", "z"},
+            alphabet={"a", "b"},
+            transition={"s": {"a": "x", "b": "y"}, "x": {"a": "z"}, "y": {"a": "z"}},
+            initial_state="s",
+            accepting_states={"z"}
+        )
+        minimal = dfa.minimize()
+        self.assertEqual(len(minimal.states), 4)  # s, {x, y}, z and the dead state
+        for text in ["aa", "ba", "ab", "aaa", "a"]:
+            self.assertEqual(minimal.run(text), dfa.run(text))
+
+    def test_lazy_simulation_cache(self):
+        text = "ab" * 500 + "abb"
+        self.assertTrue(self.nfa.simulate(text))
+        info = self.nfa.cache_info()
+        self.assertLessEqual(info["size"], len(self.nfa.to_dfa().states))
+        self.assertGreater(info["hits"], len(text) - 10)
+        self.assertFalse(self.nfa.simulate("abba"))
+        self.assertFalse(self.nfa.simulate("abbc"))
+
+    def test_lazy_simulation_eviction(self):
+        self.nfa.cache_capacity = 2
+        for text in ["abb", "aabb", "babb", "ab", "abba", "", "bbbabb", "abbabb"]:
+            self.assertEqual(self.nfa.simulate(text), self.nfa.to_dfa().run(text))
+            self.assertLessEqual(self.nfa.cache_info()["size"], 2)
+        self.nfa.clear_cache()
+        self.assertEqual(self.nfa.cache_info()["size"], 0)
+
+    def test_search(self):
+        minimal = self.nfa.to_dfa().minimize()
+        self.assertEqual(minimal.search("abbaabbab"), [3, 7])
+        self.assertEqual(minimal.search("abbcabb"), [3])  # stops at the symbol outside the alphabet
+
+class TestRegexToNFA(unittest.TestCase):
+    def test_thompson_construction(self):
+        nfa = NFA.from_regex("(a|b)*abb")
+        self.assertEqual(nfa.alphabet, {"a", "b"})
+        for text in ["abb", "aabb", "babb", "ab", "abba", "", "bbbabb"]:
+            self.assertEqual(nfa.simulate(text), text.endswith("abb"))
+        self.assertEqual(len(nfa.to_dfa().minimize().states), 4)
+
+    def test_operators(self):
+        self.assertTrue(NFA.from_regex("ab+c?").simulate("abbb"))
+        self.assertFalse(NFA.from_regex("ab+c?").simulate("ac"))
+        self.assertTrue(NFA.from_regex("a.c", alphabet={"a", "b", "c"}).simulate("abc"))
+        self.assertFalse(NFA.from_regex("a[^b]c", alphabet={"a", "b", "c"}).simulate("abc"))
+        self.assertTrue(NFA.from_regex("a\\*").simulate("a*"))
+        self.assertTrue(NFA.from_regex("a|").simulate(""))
+
+    def test_malformed_patterns(self):
+        for pattern in ["(ab", "ab)", "*a", "[ab", "a\\"]:
+            with self.assertRaises(ValueError):
+                NFA.from_regex(pattern)
+
+    def test_motif_scan(self):
+        text = "GGTATAAATTATATATGCTATATAT"
+        expected = [m.start() + 7 for m in re.finditer(r"(?=TATA[AT]A[AT])", text)]
+        dfa = NFA.from_regex("TATA[AT]A[AT]", alphabet=set("ACGT"), unanchored=True).to_dfa().minimize()
+        self.assertEqual(dfa.search(text), expected)
+        iupac = NFA.from_regex("TATAWAW", iupac=True, unanchored=True).to_dfa().minimize()
+        self.assertEqual(iupac.search(text), expected)
+        self.assertEqual(iupac.search("TATAANNTATAAAT", restart=True), [14])
+        self.assertEqual(iupac.search("TATAANNTATAAAT"), [])
+
+    def test_iupac_codes(self):
+        nfa = NFA.from_regex("RYN", iupac=True)
+        self.assertEqual(nfa.alphabet, set("ACGT"))
+        self.assertTrue(nfa.simulate("ATG"))
+        self.assertFalse(nfa.simulate("TAG"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
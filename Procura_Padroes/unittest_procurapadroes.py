@@ -1,4 +1,7 @@
+import io
+import random
 import unittest
+from unittest.mock import patch
 import procurapadroes as ps
 
 class PatternSearchTests:
@@ -63,9 +66,170 @@ class TestRabinKarp(PatternSearchTests, unittest.TestCase):
     def setUp(self):
         self.func = ps.rabin_karp
 
-class TestBoyerMoore(PatternSearchTests, unittest.TestCase):
+    def test_rolling_hash(self):
+        seq = "ACGTTGCA" * 30
+        pattern = seq[3:40]
+        self.assertEqual(self.func(seq, pattern), ps.naive(seq, pattern))
+
+    def test_non_latin1_sequence(self):
+        seq = "αβγαβ€αβ" * 5
+        for pattern in ["αβ", "β€α", "γαβ€"]:
+            self.assertEqual(self.func(seq, pattern), ps.naive(seq, pattern))
+
+    def test_hash_collision_is_verified(self):
+        seq = "ATAGCAGTACGTACGATACG"
+        targets = {ps.rk_hash("ACG"): ["ACG", "TTT"]}   # "TTT" posing as a colliding pattern
+        self.assertEqual(ps.rabin_karp_scan(seq, 3, targets), {"ACG": [8, 12, 17], "TTT": []})
+
+    def test_multi_pattern(self):
+        seq = "ATAGCAGTACGTACGATACG"
+        patterns = ["ACG", "TAC", "GCT", "TACGT", "ACG"]
+        expected = {pattern: ps.naive(seq, pattern) for pattern in patterns}
+        self.assertEqual(ps.rabin_karp_multi(seq, patterns), expected)
+
+    def test_multi_pattern_kmer_panel(self):
+        random.seed(5)
+        seq = "".join(random.choice("ACGT") for _ in range(2000))
+        panel = {"".join(random.choice("ACGT") for _ in range(6)) for _ in range(50)}
+        result = ps.rabin_karp_multi(seq, panel)
+        self.assertEqual(set(result), panel)
+        for kmer in panel:
+            self.assertEqual(result[kmer], ps.naive(seq, kmer))
+
+class ExtraPatternSearchTests(PatternSearchTests):
+    def test_low_entropy_sequence(self):
+        seq = "AAAAAAAACAAAAAAAAAACAAAAAAAACA"
+        pattern = "AAAAAAAC"
+        self.assertEqual(self.func(seq, pattern), ps.naive(seq, pattern))
+
+    def test_random_against_naive(self):
+        random.seed(7)
+        for _ in range(300):
+            alphabet = random.choice(["AC", "ACGT", "αβγ"])
+            seq = "".join(random.choice(alphabet) for _ in range(random.randint(0, 40)))
+            pattern = "".join(random.choice(alphabet) for _ in range(random.randint(1, 6)))
+            self.assertEqual(self.func(seq, pattern), ps.naive(seq, pattern))
+
+class TestBoyerMoore(ExtraPatternSearchTests, unittest.TestCase):
     def setUp(self):
         self.func = ps.boyer_moore
 
+    def test_good_suffix_table(self):
+        self.assertEqual(ps.good_suffix_table("ABBABAB"), [5, 5, 5, 5, 2, 5, 4, 1])
+
+class TestHorspool(ExtraPatternSearchTests, unittest.TestCase):
+    def setUp(self):
+        self.func = ps.horspool
+
+class TestSunday(ExtraPatternSearchTests, unittest.TestCase):
+    def setUp(self):
+        self.func = ps.sunday
+
+class TestAutoSearch(ExtraPatternSearchTests, unittest.TestCase):
+    def setUp(self):
+        self.func = ps.auto_search
+
+    def test_selection(self):
+        self.assertIs(ps.select_algorithm("ACGTACGT"), ps.horspool)
+        self.assertIs(ps.select_algorithm("AAAC"), ps.shift_and)
+        self.assertIs(ps.select_algorithm("AAAAAAAAAAAAAAAC"), ps.boyer_moore)
+        self.assertIs(ps.select_algorithm("AAAC", alphabet_size=20), ps.horspool)
+
+    def test_alphabet_from_sequence(self):
+        seq = "ACGTTGCAAGTCAAAAAAAAAAAAAAAAAAAAAAC"
+        with patch.object(ps, "horspool", wraps=ps.horspool) as horspool:
+            self.assertEqual(ps.auto_search(seq, "A" * 20), ps.naive(seq, "A" * 20))
+            self.assertEqual(ps.auto_search(seq, "AAAC"), ps.naive(seq, "AAAC"))
+        self.assertEqual(horspool.call_count, 2)
+
+class TestShiftAnd(PatternSearchTests, unittest.TestCase):
+    def setUp(self):
+        self.func = ps.shift_and
+
+    def test_long_pattern(self):
+        seq = "ACGT" * 50
+        pattern = "ACGT" * 20
+        self.assertEqual(self.func(seq, pattern), ps.naive(seq, pattern))
+
+class TestWuManber(unittest.TestCase):
+    def test_exact_matches(self):
+        seq = "ATAGCAGTACGTACGATACG"
+        self.assertEqual(ps.wu_manber(seq, "ACG", 0), [(i + 3, 0) for i in ps.naive(seq, "ACG")])
+
+    def test_errors(self):
+        seq = "GGATTACAGG"
+        self.assertEqual(ps.wu_manber(seq, "ATTGCA", 0), [])
+        self.assertEqual(ps.wu_manber(seq, "ATTGCA", 1), [(8, 1)])     # Substitution G -> A
+        self.assertIn((8, 1), ps.wu_manber(seq, "ATTCA", 1))           # Insertion of A in the sequence
+        self.assertIn((8, 1), ps.wu_manber(seq, "ATTAACA", 1))         # Deletion of A in the sequence
+
+    def test_against_edit_distance(self):
+        def matches(seq, pattern, k):
+            column = list(range(len(pattern) + 1))
+            result = [(0, column[-1])] if column[-1] <= k else []
+            for i, char in enumerate(seq):
+                new = [0]
+                for j in range(1, len(pattern) + 1):
+                    new.append(min(column[j] + 1, new[j - 1] + 1, column[j - 1] + (pattern[j - 1] != char)))
+                column = new
+                if column[-1] <= k:
+                    result.append((i + 1, column[-1]))
+            return result
+
+        random.seed(3)
+        for _ in range(200):
+            seq = "".join(random.choice("ACGT") for _ in range(random.randint(0, 30)))
+            pattern = "".join(random.choice("ACGT") for _ in range(random.randint(0, 6)))
+            k = random.randint(0, 3)
+            self.assertEqual(ps.wu_manber(seq, pattern, k), matches(seq, pattern, k))
+
+    def test_negative_errors(self):
+        with self.assertRaises(ValueError):
+            ps.wu_manber("ACGT", "AC", -1)
+
+class TestStreamSearch(unittest.TestCase):
+    def test_chunks_match_whole_text(self):
+        rng = random.Random(0)
+        seq = "".join(rng.choices("ACGT", k=2000))
+        for pattern in ["ACG", "A", seq[500:520], "TTTT"]:
+            expected = ps.naive(seq, pattern)
+            for matcher in [ps.naive, ps.KMP, ps.rabin_karp, ps.boyer_moore]:
+                cuts = sorted(rng.sample(range(1, len(seq)), 40))
+                chunks = [seq[i:j] for i, j in zip([0] + cuts, cuts + [len(seq)])]
+                self.assertEqual(list(ps.stream_search(chunks, pattern, matcher)), expected)
+
+    def test_file_object(self):
+        seq = "ATAGCAGTACGTACGATACG" * 50
+        stream = io.StringIO(seq)
+        self.assertEqual(list(ps.stream_search(stream, "ACG", chunk_size=7)), ps.KMP(seq, "ACG"))
+
+    def test_empty_pattern(self):
+        self.assertEqual(list(ps.stream_search(["ACGT"], "")), [])
+
+    def test_fasta_wrapped_lines(self):
+        fasta = ">chr1\nACGTAC\nGTTTAC\n"
+        self.assertEqual(list(ps.stream_search(io.StringIO(fasta), "ACGTT", fasta=True)), [("chr1", 4)])
+
+    def test_fasta_chunks(self):
+        fasta = ">chr1 first record\r\nACGT\r\nAC\r\n;comment\r\n>chr2\r\nGGGG\r\n"
+        chunks = list(ps.fasta_chunks(io.StringIO(fasta), chunk_size=3))
+        self.assertEqual("".join(chunk for name, chunk in chunks if name == "chr1"), "ACGTAC")
+        self.assertEqual("".join(chunk for name, chunk in chunks if name == "chr2"), "GGGG")
+        self.assertEqual(list(ps.fasta_chunks(io.StringIO("ACGT\nAC\n"))), [(None, "ACGTAC")])
+
+    def test_fasta_records(self):
+        rng = random.Random(1)
+        records = {f"seq{k}": "".join(rng.choices("ACGT", k=rng.randint(50, 400))) for k in range(4)}
+        lines = []
+        for name, seq in records.items():
+            lines.append(f">{name} description")
+            lines.extend(seq[i:i + 60] for i in range(0, len(seq), 60))
+        fasta = "\n".join(lines) + "\n"
+        for pattern in ["ACG", "TTAG", records["seq2"][55:70]]:
+            expected = [(name, i) for name, seq in records.items() for i in ps.naive(seq, pattern)]
+            for chunk_size in (7, 64, 1 << 20):
+                found = list(ps.stream_search(io.StringIO(fasta), pattern, chunk_size=chunk_size, fasta=True))
+                self.assertEqual(found, expected)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file